@@ -48,7 +48,7 @@ const PYTHON_WEBSEARCH_PATH = path.join(__dirname, '..', 'websearch-service', 'a
  */
 async function callPythonWebSearch(query, mode = 'research', maxResults = 3) {
   return new Promise((resolve, reject) => {
-    const cmd = `python "${PYTHON_WEBSEARCH_PATH}" --query "${query.replace(/"/g, '\\"')}" --mode ${mode} --max-results ${maxResults}`;
+    const cmd = `python "${PYTHON_WEBSEARCH_PATH}" --query "${query.replace(/"/g, '\\"')}" --mode ${mode} --max-results ${maxResults} --format compact`;
     
     exec(cmd, { cwd: path.join(__dirname, '..') }, (error, stdout, stderr) => {
       if (error) {
@@ -70,6 +70,22 @@ async function callPythonWebSearch(query, mode = 'research', maxResults = 3) {
   });
 }
 
+/**
+ * Expands a compact context (array of lines and result indices) from the
+ * Python bridge back into the full context string.
+ * @param {Array|string} context - Compact context segments or plain string
+ * @param {Array} results - Result list whose content the indices refer to
+ * @returns {string} Full context string
+ */
+function expandCompactContext(context, results = []) {
+  if (!Array.isArray(context)) {
+    return context;
+  }
+  return context
+    .map(segment => (typeof segment === 'number' ? (results[segment]?.content || '') : segment))
+    .join('\n');
+}
+
 // Trust proxy for zrok tunnel
 app.set('trust proxy', 1);
 
@@ -832,7 +848,7 @@ app.post('/api/research', authService.authenticateToken.bind(authService), async
     console.log(`[Research] Completed: ${result.sources?.successful || 0} sources analyzed`);
     res.json({
       query: result.query,
-      context: result.context,
+      context: expandCompactContext(result.context, result.results),
       summary: result.summary || '',
       sources: result.sources,
       findings: result.results
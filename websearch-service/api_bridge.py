@@ -4,25 +4,79 @@ API Bridge für Node.js Integration
 ==================================
 
 Dieses Skript dient als Brücke zwischen dem Node.js Backend und dem
-Python WebSearchIntegrator. Es kann als CLI-Tool aufgerufen werden.
+Python WebSearchIntegrator. Es kann als CLI-Tool aufgerufen werden oder
+mit --serve als langlebiger Prozess laufen.
 
 Verwendung:
     python api_bridge.py --query "Suchbegriff" --max-results 3
+    python api_bridge.py --query "Suchbegriff" --format compact
+    python api_bridge.py --serve
+    python api_bridge.py --serve --workers 4 --page-cache /var/cache/websearch
     
 Output:
-    JSON-String mit Kontext für Ollama
+    JSON-String mit Kontext für Ollama. Mit --format compact wird ohne
+    Einrückung ausgegeben und der Kontext referenziert den Content der
+    Ergebnisse per Index, statt ihn zu kopieren. --format msgpack schreibt
+    dieselbe kompakte Struktur binär (MessagePack) nach stdout.
+
+Serve-Modus:
+    Liest JSON-Zeilen von stdin ({"id": ..., "query": ..., "mode": ...,
+    "max_results": ..., "max_content_length": ..., "passage_size": ...}) und schreibt pro Anfrage
+    eine JSON-Zeile ({"id": ..., "result": ...} bzw. {"id": ..., "error": ...})
+    nach stdout. Anfragen laufen parallel über einen gemeinsamen
+    WebSearchIntegrator (eine Session, Request-Coalescing).
+    Mit --workers N verteilt ein Supervisor die Anfragen auf N Worker-Prozesse
+    (siehe worker_pool.py), die sich über --page-cache einen Seiten-Cache teilen.
 """
 
 import asyncio
 import json
 import argparse
+import os
 import sys
-from websearch_integrator import WebSearchIntegrator, OllamaIntegration
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from websearch_integrator import (
+    WebSearchIntegrator,
+    WebSearchContext,
+    OllamaIntegration,
+    Passage,
+    logger,
+)
+from request_profiler import RequestProfiler, profiler_from_env
+from http_archive import transport_from_args
+from page_cache import PageCacheTransport
+from worker_pool import WorkerPool, WorkerPoolError
+from embedding_rerank import EmbeddingReranker
+
+# Optional: Binäres Output-Format
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+OUTPUT_FORMATS = ["json", "compact", "msgpack"]
+MODES = ["search", "research", "crawl", "ollama"]
+
 
+@asynccontextmanager
+async def _integrator_scope(integrator: Optional[WebSearchIntegrator] = None):
+    """Nutzt den übergebenen Integrator oder erstellt (und schließt) einen eigenen"""
+    if integrator is not None:
+        yield integrator
+    else:
+        async with WebSearchIntegrator() as own_integrator:
+            yield own_integrator
 
-async def search_only(query: str, max_results: int = 5):
+
+async def search_only(
+    query: str,
+    max_results: int = 5,
+    integrator: Optional[WebSearchIntegrator] = None
+):
     """Nur Suche, kein Scraping"""
-    async with WebSearchIntegrator() as integrator:
+    async with _integrator_scope(integrator) as integrator:
         results = await integrator.search(query, max_results)
         return {
             "query": query,
@@ -37,40 +91,139 @@ async def search_only(query: str, max_results: int = 5):
         }
 
 
-async def full_research(query: str, max_results: int = 3, max_content_length: int = 3000):
-    """Komplette Suche + Scraping"""
-    async with WebSearchIntegrator() as integrator:
-        result = await integrator.search_and_build_context(
+async def full_research(
+    query: str,
+    max_results: int = 3,
+    max_content_length: int = 3000,
+    compact: bool = False,
+    integrator: Optional[WebSearchIntegrator] = None,
+    passage_size: Optional[int] = None,
+    adaptive: bool = False,
+    snippet_threshold: float = 0.8
+):
+    """Komplette Suche + Scraping (adaptive: nur scrapen, wenn Snippets nicht reichen)"""
+    async with _integrator_scope(integrator) as integrator:
+        if adaptive:
+            result = await integrator.adaptive_search_and_build_context(
+                query=query,
+                max_results=max_results,
+                max_content_length=max_content_length,
+                snippet_threshold=snippet_threshold,
+                passage_size=passage_size,
+                expand_context=not compact
+            )
+        else:
+            result = await integrator.search_and_build_context(
+                query=query,
+                max_results=max_results,
+                max_content_length=max_content_length,
+                passage_size=passage_size,
+                expand_context=not compact
+            )
+        
+        return _research_payload(integrator, result, compact, passage_size)
+
+
+async def deep_research(
+    query: str,
+    max_results: int = 3,
+    max_content_length: int = 3000,
+    depth: int = 2,
+    max_pages: int = 10,
+    time_budget: float = 30.0,
+    max_pages_per_host: int = 4,
+    compact: bool = False,
+    integrator: Optional[WebSearchIntegrator] = None,
+    passage_size: Optional[int] = None
+):
+    """Suche + Crawl entlang der Content-Links über mehrere Hops"""
+    async with _integrator_scope(integrator) as integrator:
+        result = await integrator.crawl_and_build_context(
             query=query,
             max_results=max_results,
-            max_content_length=max_content_length
+            max_pages=max_pages,
+            max_depth=depth,
+            time_budget=time_budget,
+            max_pages_per_host=max_pages_per_host,
+            max_content_length=max_content_length,
+            passage_size=passage_size,
+            expand_context=not compact
         )
         
-        return {
-            "query": result.query,
-            "context": result.combined_context,
-            "sources": {
-                "total": result.total_sources,
-                "successful": result.successful_scrapes,
-                "failed": result.failed_scrapes
-            },
-            "results": [
-                {
-                    "title": r.title,
-                    "url": r.url,
-                    "snippet": r.snippet,
-                    "content": r.content if r.scrape_success else None,
-                    "success": r.scrape_success,
-                    "error": r.scrape_error
-                }
-                for r in result.results
-            ]
+        return _research_payload(integrator, result, compact, passage_size)
+
+
+def _research_payload(
+    integrator: WebSearchIntegrator,
+    result: WebSearchContext,
+    compact: bool = False,
+    passage_size: Optional[int] = None
+) -> dict:
+    """Baut das Output-Dictionary für research/crawl"""
+    if compact:
+        # Kontext als Segmente: Integer verweisen auf results[i].content
+        context = result.context_segments
+        if context is None:
+            context = integrator.build_context_segments(result.query, result.results)
+    else:
+        context = result.combined_context
+    
+    results = []
+    for r in result.results:
+        entry = {
+            "title": r.title,
+            "url": r.url,
+            "snippet": r.snippet,
+            "content": r.content if r.scrape_success or r.from_snippet else None,
+            "success": r.scrape_success,
+            "from_snippet": r.from_snippet,
+            "error": r.scrape_error
         }
+        if r.rerank_score is not None:
+            entry["score"] = round(r.rerank_score, 4)
+        if passage_size:
+            entry["passages"] = [_passage_to_dict(p, compact) for p in r.passages]
+        results.append(entry)
+    
+    return {
+        "query": result.query,
+        "path": result.path,
+        "context": context,
+        "sources": {
+            "total": result.total_sources,
+            "successful": result.successful_scrapes,
+            "failed": result.failed_scrapes
+        },
+        "results": results
+    }
+
 
+def _passage_to_dict(passage: Passage, compact: bool = False) -> dict:
+    """
+    Serialisiert eine Passage. Im kompakten Format entfällt der Text,
+    er ergibt sich aus content[start:end] des zugehörigen Ergebnisses.
+    """
+    data = {
+        "url": passage.url,
+        "index": passage.index,
+        "start": passage.start,
+        "end": passage.end,
+        "hash": passage.content_hash
+    }
+    if not compact:
+        data["text"] = passage.text
+    return data
 
-async def ollama_context(query: str, model: str = "llama3.2", max_results: int = 3):
+
+async def ollama_context(
+    query: str,
+    model: str = "llama3.2",
+    max_results: int = 3,
+    integrator: Optional[WebSearchIntegrator] = None
+):
     """Generiert Ollama-kompatiblen Request"""
-    async with OllamaIntegration() as ollama:
+    async with _integrator_scope(integrator) as integrator:
+        ollama = OllamaIntegration(integrator=integrator)
         request_data = await ollama.query_with_web_context(
             user_query=query,
             model=model,
@@ -92,20 +245,292 @@ async def ollama_context(query: str, model: str = "llama3.2", max_results: int =
         }
 
 
+def create_integrator(args: argparse.Namespace) -> WebSearchIntegrator:
+    """Erstellt einen WebSearchIntegrator aus den CLI-Argumenten"""
+    if args.profile_dir:
+        profiler = RequestProfiler(args.profile_dir, sample_rate=args.profile_rate)
+    else:
+        profiler = profiler_from_env()
+    
+    transport = transport_from_args(
+        record=args.record,
+        replay=args.replay,
+        latency_scale=args.replay_latency_scale
+    )
+    if args.page_cache:
+        transport = PageCacheTransport(
+            args.page_cache,
+            ttl=args.page_cache_ttl,
+            inner=transport,
+            max_size_mb=args.page_cache_max_mb
+        )
+    
+    reranker = None
+    if args.rerank:
+        reranker = EmbeddingReranker(
+            ollama_base_url=args.ollama_url,
+            model=args.embedding_model,
+            cache_dir=args.embedding_cache
+        )
+    
+    return WebSearchIntegrator(
+        max_concurrent_requests=args.max_concurrent,
+        search_url=args.search_url,
+        profiler=profiler,
+        transport=transport,
+        reranker=reranker
+    )
+
+
+async def handle_request(
+    request: dict,
+    integrator: WebSearchIntegrator,
+    output_format: str = "json"
+) -> dict:
+    """
+    Führt eine einzelne Anfrage im gewünschten Modus aus.
+    
+    Args:
+        request: Dict mit query, mode, max_results, max_content_length, model
+        integrator: Gemeinsamer WebSearchIntegrator
+        output_format: Output-Format (beeinflusst die Kontext-Struktur)
+        
+    Returns:
+        Ergebnis-Dictionary
+    """
+    query = request.get("query")
+    if not query:
+        raise ValueError("query fehlt")
+    
+    mode = request.get("mode", "research")
+    max_results = int(request.get("max_results", 3))
+    
+    passage_size = request.get("passage_size")
+    if passage_size is not None:
+        passage_size = int(passage_size)
+        if passage_size <= 0:
+            raise ValueError("passage_size muss größer als 0 sein")
+    
+    if mode == "search":
+        return await search_only(query, max_results, integrator=integrator)
+    if mode == "research":
+        return await full_research(
+            query,
+            max_results,
+            int(request.get("max_content_length", 3000)),
+            compact=output_format != "json",
+            integrator=integrator,
+            passage_size=passage_size,
+            adaptive=bool(request.get("adaptive", False)),
+            snippet_threshold=float(request.get("snippet_threshold", 0.8))
+        )
+    if mode == "crawl":
+        return await deep_research(
+            query,
+            max_results,
+            int(request.get("max_content_length", 3000)),
+            depth=int(request.get("depth", 2)),
+            max_pages=int(request.get("max_pages", 10)),
+            time_budget=float(request.get("time_budget", 30.0)),
+            max_pages_per_host=int(request.get("max_pages_per_host", 4)),
+            compact=output_format != "json",
+            integrator=integrator,
+            passage_size=passage_size
+        )
+    if mode == "ollama":
+        return await ollama_context(
+            query,
+            request.get("model", "llama3.2"),
+            max_results,
+            integrator=integrator
+        )
+    raise ValueError(f"Unbekannter Modus: {mode}")
+
+
+async def run_once(args: argparse.Namespace) -> dict:
+    """Führt eine einzelne CLI-Anfrage aus"""
+    request = {
+        "query": args.query,
+        "mode": args.mode,
+        "max_results": args.max_results,
+        "max_content_length": args.max_content_length,
+        "model": args.model,
+        "passage_size": args.passage_size,
+        "depth": args.depth,
+        "max_pages": args.max_pages,
+        "time_budget": args.time_budget,
+        "max_pages_per_host": args.max_pages_per_host,
+        "adaptive": args.adaptive,
+        "snippet_threshold": args.snippet_threshold
+    }
+    async with create_integrator(args) as integrator:
+        return await handle_request(request, integrator, args.format)
+
+
+async def serve(args: argparse.Namespace):
+    """
+    Langlebiger Modus: JSON-Zeilen von stdin lesen, Antworten nach stdout.
+    
+    Jede Anfrage läuft als eigener Task; Antworten können daher in anderer
+    Reihenfolge als die Anfragen eintreffen und werden über "id" zugeordnet.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=2 ** 20)
+    await loop.connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader),
+        sys.stdin
+    )
+    
+    pending = set()
+    
+    def respond(response: dict):
+        sys.stdout.write(json.dumps(response, ensure_ascii=False, separators=(",", ":")) + "\n")
+        sys.stdout.flush()
+    
+    async def process(line: bytes):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Anfrage muss ein JSON-Objekt sein")
+            request_id = request.get("id")
+            result = await handle_request(request, integrator, args.format)
+            respond({"id": request_id, "result": result})
+        except Exception as e:
+            logger.error(f"Fehler bei Anfrage {request_id}: {e}")
+            respond({"id": request_id, "error": str(e)})
+    
+    logger.info("API Bridge im Serve-Modus gestartet")
+    
+    async with create_integrator(args) as integrator:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            task = asyncio.create_task(process(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        
+        # stdin geschlossen: laufende Anfragen noch abschließen
+        if pending:
+            await asyncio.gather(*pending)
+    
+    logger.info("API Bridge beendet")
+
+
+def worker_command(args: argparse.Namespace) -> list:
+    """Baut das Kommando eines Worker-Prozesses für den Supervisor-Modus"""
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        "--serve",
+        "--format", args.format,
+        "--max-concurrent", str(args.max_concurrent),
+        "--replay-latency-scale", str(args.replay_latency_scale),
+        "--profile-rate", str(args.profile_rate),
+        "--page-cache-ttl", str(args.page_cache_ttl),
+        "--page-cache-max-mb", str(args.page_cache_max_mb)
+    ]
+    for flag, value in [
+        ("--search-url", args.search_url),
+        ("--replay", args.replay),
+        ("--profile-dir", args.profile_dir),
+        ("--page-cache", args.page_cache),
+        ("--ollama-url", args.ollama_url),
+        ("--embedding-model", args.embedding_model),
+        ("--embedding-cache", args.embedding_cache)
+    ]:
+        if value:
+            command += [flag, value]
+    if args.rerank:
+        command.append("--rerank")
+    return command
+
+
+def serialize_output(result: dict, output_format: str = "json") -> bytes:
+    """
+    Serialisiert das Ergebnis im gewünschten Output-Format.
+    
+    Größe und Dauer der Serialisierung werden nach stderr geloggt,
+    stdout bleibt damit für den Payload reserviert.
+    
+    Args:
+        result: Ergebnis-Dictionary
+        output_format: json, compact oder msgpack
+        
+    Returns:
+        Serialisierter Payload als Bytes
+    """
+    start = time.perf_counter()
+    
+    if output_format == "msgpack":
+        if msgpack is None:
+            raise ImportError("msgpack ist nicht installiert. Bitte: pip install msgpack")
+        payload = msgpack.packb(result, use_bin_type=True)
+    elif output_format == "compact":
+        payload = json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    else:
+        payload = json.dumps(result, ensure_ascii=False, indent=2).encode("utf-8")
+    
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"Payload: {len(payload)} Bytes ({output_format}), Serialisierung {elapsed_ms:.2f} ms")
+    
+    return payload
+
+
+def write_output(payload: bytes, output_format: str = "json"):
+    """Schreibt den Payload nach stdout (binär für msgpack)"""
+    if output_format == "msgpack":
+        sys.stdout.buffer.write(payload)
+        sys.stdout.buffer.flush()
+    else:
+        print(payload.decode("utf-8"))
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="WebSearch API Bridge für Node.js Integration"
     )
     parser.add_argument(
         "--query", "-q",
-        required=True,
-        help="Suchbegriff"
+        help="Suchbegriff (Pflicht außer im Serve-Modus)"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Langlebiger Modus: JSON-Zeilen-Anfragen von stdin verarbeiten"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Supervisor-Modus: Anzahl Worker-Prozesse (nur mit --serve, default: 1)"
+    )
+    parser.add_argument(
+        "--page-cache",
+        default=None,
+        help="Verzeichnis für einen (prozessübergreifenden) Seiten-Cache"
+    )
+    parser.add_argument(
+        "--page-cache-ttl",
+        type=float,
+        default=3600.0,
+        help="Gültigkeit der Einträge im Seiten-Cache in Sekunden (default: 3600)"
+    )
+    parser.add_argument(
+        "--page-cache-max-mb",
+        type=float,
+        default=1024.0,
+        help="Maximale Größe des Seiten-Caches in MB, älteste Einträge werden "
+             "zuerst gelöscht (default: 1024)"
     )
     parser.add_argument(
         "--mode", "-m",
-        choices=["search", "research", "ollama"],
+        choices=MODES,
         default="research",
-        help="Modus: search (nur Suche), research (Suche+Scraping), ollama (Ollama-Format)"
+        help="Modus: search (nur Suche), research (Suche+Scraping), "
+             "crawl (Suche+Scraping+Links folgen), ollama (Ollama-Format)"
     )
     parser.add_argument(
         "--max-results", "-n",
@@ -119,34 +544,161 @@ def main():
         default=3000,
         help="Maximale Content-Länge pro URL (default: 3000)"
     )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Snippet-first: nur scrapen, wenn die Such-Snippets die Anfrage "
+             "nicht abdecken (nur research Modus)"
+    )
+    parser.add_argument(
+        "--snippet-threshold",
+        type=float,
+        default=0.8,
+        help="Nötige Snippet-Abdeckung der Suchbegriffe für --adaptive (default: 0.8)"
+    )
+    parser.add_argument(
+        "--rerank",
+        action="store_true",
+        help="Quellen per Ollama-Embeddings nach Relevanz sortieren (research/crawl)"
+    )
+    parser.add_argument(
+        "--ollama-url",
+        default=None,
+        help="Ollama-URL für Embeddings (default: $OLLAMA_URL oder http://localhost:11434)"
+    )
+    parser.add_argument(
+        "--embedding-model",
+        default=None,
+        help="Embedding-Modell (default: $EMBEDDING_MODEL oder nomic-embed-text)"
+    )
+    parser.add_argument(
+        "--embedding-cache",
+        default=None,
+        help="Verzeichnis für den persistenten Embedding-Cache"
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=2,
+        help="Maximale Link-Tiefe (nur crawl Modus, default: 2)"
+    )
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=10,
+        help="Maximale Anzahl abgerufener Seiten (nur crawl Modus, default: 10)"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        default=30.0,
+        help="Zeitbudget in Sekunden (nur crawl Modus, default: 30)"
+    )
+    parser.add_argument(
+        "--max-pages-per-host",
+        type=int,
+        default=4,
+        help="Maximale Anzahl Seiten pro Host (nur crawl Modus, default: 4)"
+    )
+    parser.add_argument(
+        "--passage-size",
+        type=int,
+        default=None,
+        help="Content zusätzlich in satzbündige Passagen mit max. N Zeichen teilen "
+             "(nur research/crawl Modus)"
+    )
     parser.add_argument(
         "--model",
         default="llama3.2",
         help="Ollama Modell (nur für ollama Modus, default: llama3.2)"
     )
+    parser.add_argument(
+        "--format", "-f",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="Output-Format: json (eingerückt), compact (ohne Duplikate), msgpack (binär, "
+             "nicht mit --serve)"
+    )
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=3,
+        help="Maximale parallele Scraping-Anfragen (default: 3)"
+    )
+    parser.add_argument(
+        "--search-url",
+        default=None,
+        help="Optionaler HTTP-Suchendpunkt im DDGS-Format statt DuckDuckGo"
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="Suche und Abrufe live ausführen und in dieses Archiv aufzeichnen"
+    )
+    parser.add_argument(
+        "--replay",
+        default=None,
+        help="Suche und Abrufe ohne Netzwerk aus diesem Archiv wiedergeben"
+    )
+    parser.add_argument(
+        "--replay-latency-scale",
+        type=float,
+        default=1.0,
+        help="Faktor für aufgezeichnete Latenzen bei --replay (0 = ohne Verzögerung)"
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=None,
+        help="Research- und Crawl-Anfragen mit cProfile/tracemalloc profilieren und hier ablegen "
+             "(alternativ: WEBSEARCH_PROFILE_DIR)"
+    )
+    parser.add_argument(
+        "--profile-rate",
+        type=float,
+        default=1.0,
+        help="Anteil der profilierten Anfragen, 0..1 (default: 1.0)"
+    )
     
     args = parser.parse_args()
     
+    if args.passage_size is not None and args.passage_size <= 0:
+        parser.error("--passage-size muss größer als 0 sein")
+    
+    if args.serve and args.format == "msgpack":
+        # Der Serve-Modus antwortet zeilenweise mit JSON
+        parser.error("--format msgpack ist mit --serve nicht möglich")
+    
+    if args.record and args.page_cache:
+        # Treffer aus dem Seiten-Cache erreichen den Recorder nie
+        parser.error("--record ist mit --page-cache nicht möglich")
+    
+    if args.workers > 1:
+        if not args.serve:
+            parser.error("--workers erfordert --serve")
+        if args.record:
+            parser.error("--record ist mit --workers nicht möglich")
+        pool = WorkerPool(worker_command(args), workers=args.workers)
+        try:
+            asyncio.run(pool.run())
+        except WorkerPoolError as e:
+            print(json.dumps({"error": str(e)}, ensure_ascii=False), file=sys.stderr)
+            sys.exit(1)
+        return
+    
+    if args.serve:
+        asyncio.run(serve(args))
+        return
+    
+    if not args.query:
+        parser.error("--query ist erforderlich (außer mit --serve)")
+    
     result = None
     try:
-        if args.mode == "search":
-            result = asyncio.run(search_only(args.query, args.max_results))
-        elif args.mode == "research":
-            result = asyncio.run(full_research(
-                args.query, 
-                args.max_results, 
-                args.max_content_length
-            ))
-        elif args.mode == "ollama":
-            result = asyncio.run(ollama_context(
-                args.query, 
-                args.model, 
-                args.max_results
-            ))
+        result = asyncio.run(run_once(args))
         
-        # JSON Output
+        # Output im gewählten Format
         if result:
-            print(json.dumps(result, ensure_ascii=False, indent=2))
+            write_output(serialize_output(result, args.format), args.format)
         else:
             raise ValueError("No result generated")
         
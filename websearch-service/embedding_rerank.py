@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+EmbeddingReranker - Quellen nach semantischer Nähe zur Suchanfrage ordnen
+=========================================================================
+
+Ohne Rerank landen die Quellen in DuckDuckGo-Reihenfolge im Kontext, schwache
+Seiten verbrauchen so das Kontext-Budget vor starken. Der Reranker bettet
+Suchanfrage und Passagen der Quellen über Ollama ein und sortiert die Quellen
+nach ihrer besten Passage (Kosinus-Ähnlichkeit).
+
+- Gebündelte Aufrufe: /api/embed mit mehreren Texten pro Request
+  (Fallback auf /api/embeddings mit einem Text pro Request)
+- Persistenter Cache: Embeddings liegen nach Content-Hash (Modell + Text) auf
+  der Festplatte, bereits gesehene Passagen werden nie erneut eingebettet
+- Vektorisierte Bewertung mit NumPy
+
+Verwendung:
+    reranker = EmbeddingReranker(cache_dir="/var/cache/websearch-embeddings")
+    async with WebSearchIntegrator(reranker=reranker) as integrator:
+        ...
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from websearch_integrator import SearchResult, WebSearchIntegrator, aiohttp, logger
+
+# Für die vektorisierte Bewertung
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class EmbeddingCache:
+    """
+    Embeddings auf der Festplatte, Schlüssel = SHA-256(Modell + Text).
+
+    Die Methoden arbeiten synchron; im Event-Loop über run_in_executor
+    aufrufen (siehe EmbeddingReranker.embed).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.npy")
+
+    def get(self, key: str) -> Optional["np.ndarray"]:
+        try:
+            return np.load(self._path(key))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, vector: "np.ndarray"):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, vector)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Embedding-Cache: Schreiben fehlgeschlagen ({e})")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def get_many(self, keys: List[str]) -> Dict[str, "np.ndarray"]:
+        """Lädt alle vorhandenen Einträge zu den Schlüsseln"""
+        vectors = {}
+        for key in keys:
+            vector = self.get(key)
+            if vector is not None:
+                vectors[key] = vector
+        return vectors
+
+    def put_many(self, vectors: Dict[str, "np.ndarray"]):
+        for key, vector in vectors.items():
+            self.put(key, vector)
+
+
+class EmbeddingReranker:
+    """Sortiert Suchergebnisse nach Embedding-Ähnlichkeit zur Suchanfrage"""
+
+    def __init__(
+        self,
+        ollama_base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        batch_size: int = 32,
+        passage_size: int = 800,
+        timeout: float = 60.0,
+        memory_entries: int = 4096
+    ):
+        """
+        Args:
+            ollama_base_url: Ollama-URL (default: $OLLAMA_URL oder localhost:11434)
+            model: Embedding-Modell (default: $EMBEDDING_MODEL oder nomic-embed-text)
+            cache_dir: Verzeichnis für den Embedding-Cache (None = nur im Speicher)
+            batch_size: Texte pro Embedding-Request
+            passage_size: Passagengröße für Quellen ohne vorhandene Passagen
+            timeout: Timeout pro Embedding-Request in Sekunden
+            memory_entries: Maximale Anzahl Embeddings im Speicher (LRU);
+                verdrängte Einträge kommen mit cache_dir von der Festplatte
+        """
+        if np is None:
+            raise ImportError("numpy ist nicht installiert. Bitte: pip install numpy")
+
+        self.ollama_base_url = (
+            ollama_base_url or os.environ.get("OLLAMA_URL", "http://localhost:11434")
+        ).rstrip("/")
+        self.model = model or os.environ.get("EMBEDDING_MODEL", "nomic-embed-text")
+        self.batch_size = batch_size
+        self.passage_size = passage_size
+        self.timeout = timeout
+        self.cache = EmbeddingCache(cache_dir) if cache_dir else None
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._batch_endpoint = True
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self.session
+
+    @staticmethod
+    async def _api_error(response: aiohttp.ClientResponse) -> Optional[str]:
+        """
+        Fehlermeldung der Ollama-API aus einer Antwort ({"error": ...}).
+
+        Fehlt der Endpunkt, antwortet Ollama mit einem Text-Body statt JSON,
+        dann ist das Ergebnis None.
+        """
+        try:
+            data = json.loads(await response.text())
+        except ValueError:
+            return None
+        if isinstance(data, dict) and "error" in data:
+            return str(data["error"])
+        return None
+
+    async def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Bettet mehrere Texte mit einem Request ein (/api/embed)"""
+        session = await self._get_session()
+
+        if self._batch_endpoint:
+            async with session.post(
+                f"{self.ollama_base_url}/api/embed",
+                json={"model": self.model, "input": texts}
+            ) as response:
+                if response.status == 404:
+                    error = await self._api_error(response)
+                    if error is not None:
+                        # Endpunkt vorhanden, z.B. Modell nicht gefunden
+                        raise RuntimeError(f"Ollama /api/embed: {error}")
+                else:
+                    response.raise_for_status()
+                    data = await response.json()
+                    return data["embeddings"]
+
+            # Ältere Ollama-Versionen kennen nur /api/embeddings
+            logger.info("Ollama ohne /api/embed, nutze /api/embeddings")
+            self._batch_endpoint = False
+
+        embeddings = []
+        for text in texts:
+            async with session.post(
+                f"{self.ollama_base_url}/api/embeddings",
+                json={"model": self.model, "prompt": text}
+            ) as response:
+                response.raise_for_status()
+                data = await response.json()
+                embeddings.append(data["embedding"])
+        return embeddings
+
+    async def embed(self, texts: List[str]) -> "np.ndarray":
+        """
+        Liefert normalisierte Embeddings (eine Zeile pro Text).
+
+        Texte, die im Speicher- oder Festplatten-Cache liegen, werden nicht
+        erneut angefragt; alle übrigen gehen gebündelt an Ollama.
+        """
+        loop = asyncio.get_running_loop()
+        keys = [EmbeddingCache.key(self.model, text) for text in texts]
+        vectors = {}
+        for key in keys:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                vectors[key] = self._memory[key]
+
+        if self.cache is not None:
+            # Festplattenzugriffe im Executor, damit der Event-Loop frei bleibt
+            uncached = list(dict.fromkeys(key for key in keys if key not in vectors))
+            if uncached:
+                vectors.update(await loop.run_in_executor(None, self.cache.get_many, uncached))
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing[key] = text
+
+        embedded: Dict[str, "np.ndarray"] = {}
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), self.batch_size):
+            batch_keys = missing_keys[start:start + self.batch_size]
+            embeddings = await self._embed_batch([missing[k] for k in batch_keys])
+            for key, embedding in zip(batch_keys, embeddings):
+                embedded[key] = np.asarray(embedding, dtype=np.float32)
+
+        if embedded and self.cache is not None:
+            await loop.run_in_executor(None, self.cache.put_many, embedded)
+
+        vectors.update(embedded)
+        self._remember(vectors)
+        logger.info(
+            f"Embeddings: {len(texts) - len(missing)} aus Cache, "
+            f"{len(missing)} neu in {-(-len(missing) // self.batch_size)} Batches"
+        )
+
+        matrix = np.vstack([vectors[key] for key in keys])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    def _remember(self, vectors: Dict[str, "np.ndarray"]):
+        """Legt Embeddings im LRU-Speicher ab und verdrängt die ältesten"""
+        for key, vector in vectors.items():
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    async def rerank(
+        self,
+        query: str,
+        results: List[SearchResult],
+        integrator: WebSearchIntegrator
+    ) -> List[SearchResult]:
+        """
+        Sortiert Ergebnisse nach der Ähnlichkeit ihrer besten Passage.
+
+        Ergebnisse ohne Content behalten ihre Reihenfolge und stehen am Ende.
+        Der Score steht anschließend in result.rerank_score.
+
+        Args:
+            query: Suchanfrage
+            results: Ergebnisse (gescraped oder mit Snippet als Content)
+            integrator: Für das Passagen-Chunking fehlender Passagen
+
+        Returns:
+            Neu sortierte Ergebnisliste
+        """
+        candidates = [r for r in results if r.content and (r.scrape_success or r.from_snippet)]
+        rest = [r for r in results if not (r.content and (r.scrape_success or r.from_snippet))]
+        if len(candidates) < 2:
+            return results
+
+        texts = []
+        owners = []
+        for i, result in enumerate(candidates):
+            passages = result.passages or integrator.chunk_passages(result, self.passage_size)
+            for passage in passages or []:
+                texts.append(passage.text)
+                owners.append(i)
+
+        if not texts:
+            return results
+
+        vectors = await self.embed([query] + texts)
+        similarities = vectors[1:] @ vectors[0]
+
+        # Bester Passagen-Score je Quelle (owners ist aufsteigend gruppiert)
+        owners_array = np.asarray(owners)
+        starts = np.flatnonzero(np.r_[True, owners_array[1:] != owners_array[:-1]])
+        best = np.maximum.reduceat(similarities, starts)
+        scores = np.full(len(candidates), -1.0, dtype=np.float32)
+        scores[owners_array[starts]] = best
+
+        order = np.argsort(-scores, kind="stable")
+        for i, result in enumerate(candidates):
+            result.rerank_score = float(scores[i])
+
+        return [candidates[i] for i in order] + rest
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+HTTP-Archiv - Aufzeichnung und Wiedergabe für WebSearchIntegrator
+=================================================================
+
+Transports sitzen unter WebSearchIntegrator.search() und _scrape_url():
+
+- RecordingTransport: führt Suche und Abrufe live aus und schreibt Ergebnisse,
+  Header, Bodies und Antwortzeiten in ein Archiv
+- ReplayTransport: beantwortet Suche und Abrufe ausschließlich aus dem Archiv,
+  optional mit den originalen (oder skalierten) Latenzen
+
+Damit laufen Profiling, Regressionstests und Parser-Vergleiche reproduzierbar
+auf denselben Eingaben und ohne Netzwerk.
+
+Archivformat: gzip-komprimiertes JSON Lines, ein Eintrag pro Zeile:
+    {"kind": "search", "key": ..., "results": [...], "elapsed": 0.41}
+    {"kind": "search", "key": ..., "error": "other", "message": "...", "elapsed": 2.1}
+    {"kind": "fetch", "key": ..., "url": ..., "status": 200, "headers": {...},
+     "body": "<base64>", "encoding": "utf-8", "elapsed": 0.12}
+    {"kind": "fetch", "key": ..., "error": "timeout", "elapsed": 10.0}
+
+Verwendung:
+    transport = RecordingTransport("session.jsonl.gz")
+    async with WebSearchIntegrator(transport=transport) as integrator:
+        ...
+
+    transport = ReplayTransport("session.jsonl.gz", latency_scale=0.0)
+    async with WebSearchIntegrator(transport=transport) as integrator:
+        ...
+"""
+
+import asyncio
+import base64
+import gzip
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from websearch_integrator import (
+    FetchResponse,
+    SearchResult,
+    WebSearchIntegrator,
+    ClientError,
+    logger,
+)
+
+LiveFetch = Callable[[str], Awaitable[FetchResponse]]
+LiveSearch = Callable[[str, int, str], Awaitable[List[SearchResult]]]
+
+
+class ArchiveMiss(Exception):
+    """Anfrage ist nicht im Archiv enthalten"""
+
+
+class RecordedError(Exception):
+    """Bei der Aufnahme aufgetretener Fehler (außer Timeout/Client-Fehler)"""
+
+
+def _error_entry(entry: Dict[str, Any], error: Exception, elapsed: float) -> Dict[str, Any]:
+    """Archiv-Eintrag für einen fehlgeschlagenen Aufruf"""
+    if isinstance(error, asyncio.TimeoutError):
+        return dict(entry, error="timeout", elapsed=elapsed)
+    kind = "client" if isinstance(error, ClientError) else "other"
+    return dict(entry, error=kind, message=str(error), elapsed=elapsed)
+
+
+def _raise_recorded(entry: Dict[str, Any]):
+    """Wirft den aufgezeichneten Fehler eines Eintrags erneut (falls vorhanden)"""
+    error = entry.get("error")
+    if error == "timeout":
+        raise asyncio.TimeoutError()
+    if error == "client":
+        raise ClientError(entry.get("message", ""))
+    if error:
+        raise RecordedError(entry.get("message", ""))
+
+
+def search_key(query: str, max_results: int, region: str) -> str:
+    """Archiv-Schlüssel einer Suche"""
+    return f"{region}:{max_results}:{WebSearchIntegrator._normalize_query(query)}"
+
+
+def fetch_key(url: str) -> str:
+    """Archiv-Schlüssel eines Abrufs"""
+    return WebSearchIntegrator._normalize_url(url)
+
+
+class Transport:
+    """
+    Basisklasse: reicht Suche und Abrufe unverändert an die Live-Funktionen
+    des WebSearchIntegrator durch.
+    """
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        region: str,
+        live: LiveSearch
+    ) -> List[SearchResult]:
+        return await live(query, max_results, region)
+
+    async def fetch(self, url: str, live: LiveFetch) -> FetchResponse:
+        return await live(url)
+
+    def close(self):
+        pass
+
+
+class RecordingTransport(Transport):
+    """Führt alles live aus und zeichnet es im Archiv auf"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Archivdatei (wird überschrieben)
+        """
+        self.path = path
+        self.entries = 0
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def _write(self, entry: Dict[str, Any]):
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self.entries += 1
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        region: str,
+        live: LiveSearch
+    ) -> List[SearchResult]:
+        entry: Dict[str, Any] = {"kind": "search", "key": search_key(query, max_results, region)}
+        start = time.perf_counter()
+        try:
+            results = await live(query, max_results, region)
+        except Exception as e:
+            self._write(_error_entry(entry, e, time.perf_counter() - start))
+            raise
+        self._write(dict(
+            entry,
+            results=[
+                {"title": r.title, "href": r.url, "body": r.snippet}
+                for r in results
+            ],
+            elapsed=time.perf_counter() - start
+        ))
+        return results
+
+    async def fetch(self, url: str, live: LiveFetch) -> FetchResponse:
+        entry: Dict[str, Any] = {"kind": "fetch", "key": fetch_key(url)}
+        start = time.perf_counter()
+        try:
+            response = await live(url)
+        except (asyncio.TimeoutError, ClientError) as e:
+            self._write(_error_entry(entry, e, time.perf_counter() - start))
+            raise
+
+        self._write(dict(
+            entry,
+            url=response.url,
+            status=response.status,
+            headers=response.headers,
+            body=base64.b64encode(response.body).decode("ascii"),
+            encoding=response.encoding,
+            elapsed=response.elapsed
+        ))
+        return response
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            logger.info(f"Archiv geschrieben: {self.path} ({self.entries} Einträge)")
+
+
+class ReplayTransport(Transport):
+    """
+    Beantwortet Suche und Abrufe aus einem Archiv, ohne Netzwerk.
+
+    Mehrfach aufgezeichnete Schlüssel werden in Aufnahme-Reihenfolge
+    wiedergegeben, danach wird der letzte Eintrag wiederholt.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0):
+        """
+        Args:
+            path: Archivdatei
+            latency_scale: Faktor für die aufgezeichneten Latenzen
+                (1.0 = original, 0.0 = ohne Verzögerung)
+        """
+        self.path = path
+        self.latency_scale = latency_scale
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursor: Dict[str, int] = {}
+
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(f"{entry['kind']}:{entry['key']}", []).append(entry)
+
+        logger.info(f"Archiv geladen: {path} ({len(self._entries)} Schlüssel)")
+
+    def _next(self, kind: str, key: str) -> Dict[str, Any]:
+        entries = self._entries.get(f"{kind}:{key}")
+        if not entries:
+            raise ArchiveMiss(f"Nicht im Archiv: {kind} {key}")
+        position = self._cursor.get(f"{kind}:{key}", 0)
+        self._cursor[f"{kind}:{key}"] = position + 1
+        return entries[min(position, len(entries) - 1)]
+
+    async def _delay(self, entry: Dict[str, Any]):
+        if self.latency_scale > 0:
+            await asyncio.sleep(entry.get("elapsed", 0.0) * self.latency_scale)
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        region: str,
+        live: LiveSearch
+    ) -> List[SearchResult]:
+        entry = self._next("search", search_key(query, max_results, region))
+        await self._delay(entry)
+        _raise_recorded(entry)
+        return [WebSearchIntegrator._result_from_ddgs(r) for r in entry["results"]]
+
+    async def fetch(self, url: str, live: LiveFetch) -> FetchResponse:
+        entry = self._next("fetch", fetch_key(url))
+        await self._delay(entry)
+        _raise_recorded(entry)
+
+        return FetchResponse(
+            url=entry["url"],
+            status=entry["status"],
+            headers=entry["headers"],
+            body=base64.b64decode(entry["body"]),
+            encoding=entry.get("encoding"),
+            elapsed=entry.get("elapsed", 0.0)
+        )
+
+
+def transport_from_args(
+    record: Optional[str] = None,
+    replay: Optional[str] = None,
+    latency_scale: float = 1.0
+) -> Optional[Transport]:
+    """Erstellt einen Transport aus CLI-Optionen (None = live ohne Archiv)"""
+    if record and replay:
+        raise ValueError("--record und --replay schließen sich aus")
+    if record:
+        return RecordingTransport(record)
+    if replay:
+        return ReplayTransport(replay, latency_scale=latency_scale)
+    return None
@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+"""
+Load-Replay für die API Bridge
+==============================
+
+Spielt ein Query-Log mit fester Rate (Open-Loop) gegen api_bridge.py ab und
+misst, wie viele Research-Anfragen pro Sekunde eine Maschine verkraftet.
+
+Suche, Ziel-Websites und Ollama-Embeddings werden durch einen lokalen
+Stand-in-Server ersetzt (aiohttp), damit die Messung reproduzierbar ist und
+kein Traffic ins Netz geht.
+
+Targets:
+- cli:   pro Anfrage ein eigener Prozess (wie server.js es heute macht)
+- serve: ein langlebiger Prozess (api_bridge.py --serve), Anfragen als JSON-Zeilen
+
+Verwendung:
+    python load_replay.py --qps 2 --duration 30
+    python load_replay.py --target serve --qps-steps 1,2,4,8,16 --max-concurrent 3
+    python load_replay.py --queries queries.txt --target serve --qps 5 --json
+    python load_replay.py --target serve --workers 4 --page-cache /tmp/cache --qps-steps 4,8,16
+
+Das Query-Log ist entweder eine Textdatei (eine Query pro Zeile) oder JSONL
+mit {"query": ..., "mode": ...} pro Zeile (mode "crawl" folgt den Links
+der Stand-in-Seiten).
+
+Gemessen werden Latenz (p50/p95/p99, ab geplantem Sendezeitpunkt, damit
+Rückstau mitgezählt wird), Fehlerrate, erreichter Durchsatz, CPU-Zeit und
+Peak-RSS der Bridge-Prozesse (kumuliert seit Start des Lasttests, da das
+Betriebssystem nur das Maximum aller beendeten Kindprozesse liefert). Eine Stufe gilt als gesättigt, wenn der
+Durchsatz unter 90% der angebotenen Rate fällt, mehr als 5% Fehler auftreten
+oder p95 mehr als das Dreifache der ersten Stufe beträgt.
+"""
+
+import asyncio
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from typing import List, Dict, Optional, Any
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+    print("Warnung: aiohttp nicht installiert. Bitte: pip install aiohttp", file=sys.stderr)
+
+BRIDGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_bridge.py")
+
+DEFAULT_QUERIES = [
+    "Aktuelle Entwicklungen bei KI",
+    "Wetter Berlin morgen",
+    "Python asyncio Tutorial",
+    "Aktuelle Entwicklungen bei KI",
+    "Was ist Retrieval Augmented Generation",
+    "Bundesliga Ergebnisse",
+    "Wetter Berlin morgen",
+    "Ollama Modelle Vergleich",
+]
+
+LOREM = (
+    "Die Forschung zeigt deutliche Fortschritte in diesem Bereich. "
+    "Mehrere Studien belegen die Ergebnisse aus dem vergangenen Jahr. "
+    "Experten erwarten weitere Entwicklungen in den kommenden Monaten. "
+    "Die Daten wurden von unabhängigen Instituten erhoben und geprüft. "
+)
+
+
+@dataclass
+class RequestSample:
+    """Messwerte einer einzelnen Anfrage"""
+    query: str
+    latency: float
+    success: bool
+    error: Optional[str] = None
+
+
+@dataclass
+class StepReport:
+    """Auswertung einer Laststufe"""
+    target: str
+    offered_qps: float
+    max_concurrent: int
+    requests: int
+    errors: int
+    error_rate: float
+    achieved_qps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    cpu_seconds: float
+    cpu_cores: float
+    cumulative_peak_rss_mb: float
+    saturated: bool = False
+    error_samples: List[str] = field(default_factory=list)
+
+
+class StandInServer:
+    """
+    Lokaler Ersatz für DuckDuckGo, die Ziel-Websites und Ollama-Embeddings.
+
+    /search liefert Ergebnisse im DDGS-Format, die auf /page/<id> zeigen.
+    /api/embed und /api/embeddings liefern deterministische Embeddings
+    (Feature-Hashing der Wörter), ähnliche Texte sind sich also ähnlich.
+    Ohne embed_batch fehlt /api/embed wie bei älteren Ollama-Versionen.
+    Die Seiten-URLs hängen nur von der Query ab, damit wiederholte Queries
+    dieselben URLs treffen (wie im echten Betrieb).
+    """
+
+    def __init__(
+        self,
+        page_latency: float = 0.2,
+        page_jitter: float = 0.1,
+        page_paragraphs: int = 40,
+        error_rate: float = 0.0,
+        seed: int = 42,
+        page_links: int = 2,
+        embed_batch: bool = True
+    ):
+        """
+        Args:
+            page_latency: Mittlere Antwortzeit der Seiten in Sekunden
+            page_jitter: Zufällige Zusatzlatenz (0..jitter) in Sekunden
+            page_paragraphs: Anzahl Absätze pro Seite
+            error_rate: Anteil der Seiten, die mit HTTP 500 antworten
+            seed: Seed für reproduzierbare Latenzen
+            page_links: Anzahl Links im Content jeder Seite (für crawl Modus)
+            embed_batch: /api/embed anbieten (sonst nur /api/embeddings)
+        """
+        self.page_latency = page_latency
+        self.page_jitter = page_jitter
+        self.page_paragraphs = page_paragraphs
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.page_links = page_links
+        self.embed_batch = embed_batch
+        self.base_url = ""
+        self.requests: Dict[str, int] = {"search": 0, "page": 0, "embed": 0, "embeddings": 0}
+        self._runner: Optional["web.AppRunner"] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Startet den Server und gibt die Basis-URL zurück"""
+        app = web.Application()
+        app.router.add_get("/search", self._handle_search)
+        app.router.add_get("/page/{page_id}", self._handle_page)
+        if self.embed_batch:
+            app.router.add_post("/api/embed", self._handle_embed)
+        app.router.add_post("/api/embeddings", self._handle_embeddings)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self):
+        """Stoppt den Server"""
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _handle_search(self, request: "web.Request") -> "web.Response":
+        self.requests["search"] += 1
+        query = request.query.get("q", "")
+        max_results = int(request.query.get("max_results", "5"))
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:10]
+
+        results = [
+            {
+                "title": f"{query} - Quelle {i + 1}",
+                "href": f"{self.base_url}/page/{digest}-{i}",
+                "body": f"{query}: {LOREM[:120]}"
+            }
+            for i in range(max_results)
+        ]
+        return web.json_response(results)
+
+    async def _handle_page(self, request: "web.Request") -> "web.Response":
+        self.requests["page"] += 1
+        page_id = request.match_info["page_id"]
+
+        await asyncio.sleep(self.page_latency + self.random.random() * self.page_jitter)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            return web.Response(status=500, text="Internal Server Error")
+
+        paragraphs = "\n".join(
+            f"<p>{LOREM}</p>" for _ in range(self.page_paragraphs)
+        )
+        links = "".join(
+            f"<p><a href='/page/{page_id}.{k}'>Weiterlesen: Teil {k + 1}</a></p>"
+            for k in range(self.page_links)
+        )
+        html = (
+            f"<html><head><title>Seite {page_id}</title>"
+            f"<script>var tracking = true;</script></head>"
+            f"<body><nav><a href='/'>Start</a></nav>"
+            f"<article><h1>Seite {page_id}</h1>{paragraphs}{links}</article>"
+            f"<footer>Impressum</footer></body></html>"
+        )
+        return web.Response(text=html, content_type="text/html")
+
+
+    @staticmethod
+    def embedding(text: str, dimensions: int = 256) -> List[float]:
+        """Deterministisches Bag-of-Words-Embedding per Feature-Hashing"""
+        vector = [0.0] * dimensions
+        for word in text.lower().split():
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "big") % dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        return vector
+
+    async def _handle_embed(self, request: "web.Request") -> "web.Response":
+        data = await request.json()
+        texts = data.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        self.requests["embed"] += 1
+        return web.json_response({
+            "model": data.get("model", ""),
+            "embeddings": [self.embedding(text) for text in texts]
+        })
+
+    async def _handle_embeddings(self, request: "web.Request") -> "web.Response":
+        data = await request.json()
+        self.requests["embeddings"] += 1
+        return web.json_response({"embedding": self.embedding(data.get("prompt", ""))})
+
+
+class CliTarget:
+    """Startet pro Anfrage einen eigenen api_bridge.py-Prozess"""
+
+    name = "cli"
+
+    def __init__(
+        self,
+        search_url: str,
+        max_concurrent: int,
+        timeout: float,
+        extra_args: Optional[List[str]] = None,
+        workers: int = 1
+    ):
+        self.search_url = search_url
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.extra_args = extra_args or []
+
+    async def start(self):
+        pass
+
+    async def ready(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def request(self, entry: Dict[str, Any]) -> None:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, BRIDGE_PATH,
+            "--query", entry["query"],
+            "--mode", entry.get("mode", "research"),
+            "--max-results", str(entry.get("max_results", 3)),
+            "--format", "compact",
+            "--max-concurrent", str(self.max_concurrent),
+            "--search-url", self.search_url,
+            *self.extra_args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise
+
+        if process.returncode != 0:
+            raise RuntimeError(f"Exit-Code {process.returncode}")
+        result = json.loads(stdout)
+        if "error" in result:
+            raise RuntimeError(result["error"])
+
+
+class ServeTarget:
+    """Schickt Anfragen als JSON-Zeilen an einen api_bridge.py --serve-Prozess"""
+
+    name = "serve"
+
+    def __init__(
+        self,
+        search_url: str,
+        max_concurrent: int,
+        timeout: float,
+        extra_args: Optional[List[str]] = None,
+        workers: int = 1
+    ):
+        self.search_url = search_url
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.extra_args = extra_args or []
+        self.workers = workers
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, BRIDGE_PATH,
+            "--serve",
+            "--format", "compact",
+            "--max-concurrent", str(self.max_concurrent),
+            "--search-url", self.search_url,
+            *self.extra_args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=2 ** 24
+        )
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    async def ready(self):
+        """
+        Wartet, bis Bridge und alle Worker Anfragen beantworten.
+
+        Pro Worker geht eine Such-Anfrage raus, deren Query per Affinität bei
+        genau diesem Worker landet. Der Prozessstart zählt so nicht in die
+        Latenzen der Messung.
+        """
+        queries = []
+        if self.workers > 1:
+            from worker_pool import WorkerPool
+
+            for index in range(self.workers):
+                queries.append(next(
+                    f"warmup {k}" for k in itertools.count()
+                    if WorkerPool.preferred_index(f"warmup {k}", self.workers) == index
+                ))
+        else:
+            queries.append("warmup")
+
+        await asyncio.gather(*(
+            self.request({"query": query, "mode": "search", "max_results": 1})
+            for query in queries
+        ))
+
+    async def stop(self):
+        if self.process is None:
+            return
+        self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        if self._reader_task:
+            await self._reader_task
+
+    async def _read_responses(self):
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self._pending.pop(response.get("id"), None)
+            if future and not future.done():
+                future.set_result(response)
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Bridge-Prozess beendet"))
+
+    async def request(self, entry: Dict[str, Any]) -> None:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        payload = dict(entry, id=request_id)
+        self.process.stdin.write((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+
+        try:
+            response = await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+        if "error" in response:
+            raise RuntimeError(response["error"])
+
+
+TARGETS = {"cli": CliTarget, "serve": ServeTarget}
+
+
+def load_queries(path: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Lädt das Query-Log.
+
+    Args:
+        path: Pfad zu Text- oder JSONL-Datei (None = eingebaute Beispiele)
+
+    Returns:
+        Liste von Anfrage-Dicts mit mindestens "query"
+    """
+    if not path:
+        return [{"query": q} for q in DEFAULT_QUERIES]
+
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                entries.append(json.loads(line))
+            else:
+                entries.append({"query": line})
+
+    if not entries:
+        raise ValueError(f"Keine Queries in {path}")
+    return entries
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Perzentil nach Nearest-Rank-Methode"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def _children_usage() -> Dict[str, float]:
+    """CPU-Zeit und Peak-RSS aller beendeten Kindprozesse"""
+    if resource is None:
+        return {"cpu": 0.0, "maxrss_mb": 0.0}
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss: Linux in KiB, macOS in Bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "cpu": usage.ru_utime + usage.ru_stime,
+        "maxrss_mb": usage.ru_maxrss / divisor
+    }
+
+
+async def run_step(
+    target_name: str,
+    entries: List[Dict[str, Any]],
+    qps: float,
+    duration: float,
+    search_url: str,
+    max_concurrent: int,
+    timeout: float,
+    poisson: bool = False,
+    seed: int = 42,
+    extra_args: Optional[List[str]] = None,
+    workers: int = 1
+) -> StepReport:
+    """
+    Führt eine Laststufe mit fester angebotener Rate aus.
+
+    Anfragen werden unabhängig von laufenden Antworten gestartet (Open-Loop).
+    Die Latenz zählt ab dem geplanten Sendezeitpunkt, die Uhr startet erst,
+    wenn das Target bereit ist.
+    """
+    target = TARGETS[target_name](search_url, max_concurrent, timeout, extra_args, workers)
+    rng = random.Random(seed)
+    samples: List[RequestSample] = []
+    completions: List[float] = []
+
+    async def fire(entry: Dict[str, Any], scheduled: float):
+        try:
+            await target.request(entry)
+            completions.append(time.perf_counter())
+            samples.append(RequestSample(entry["query"], completions[-1] - scheduled, True))
+        except Exception as e:
+            error = type(e).__name__ if not str(e) else str(e)
+            samples.append(RequestSample(entry["query"], time.perf_counter() - scheduled, False, error))
+
+    usage_before = _children_usage()
+    await target.start()
+    await target.ready()
+
+    total = max(1, int(qps * duration))
+    tasks = []
+    start = time.perf_counter()
+    next_send = start
+
+    for entry in itertools.islice(itertools.cycle(entries), total):
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(fire(entry, next_send)))
+        next_send += rng.expovariate(qps) if poisson else 1.0 / qps
+
+    await asyncio.gather(*tasks)
+    wall = time.perf_counter() - start
+    await target.stop()
+    usage_after = _children_usage()
+
+    latencies = [s.latency for s in samples if s.success]
+    errors = [s for s in samples if not s.success]
+    cpu = usage_after["cpu"] - usage_before["cpu"]
+    # Durchsatz: erfolgreiche Antworten vom ersten geplanten Senden bis zur
+    # letzten erfolgreichen Antwort, mindestens aber total Sendeintervalle,
+    # damit der Durchsatz die angebotene Rate nicht übersteigt
+    window = max(max(completions, default=start), start + total / qps) - start
+
+    return StepReport(
+        target=target_name,
+        offered_qps=qps,
+        max_concurrent=max_concurrent,
+        requests=len(samples),
+        errors=len(errors),
+        error_rate=len(errors) / len(samples) if samples else 0.0,
+        achieved_qps=len(latencies) / window,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p95_ms=percentile(latencies, 95) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+        cpu_seconds=cpu,
+        cpu_cores=cpu / wall if wall else 0.0,
+        cumulative_peak_rss_mb=usage_after["maxrss_mb"],
+        error_samples=sorted({e.error for e in errors})[:5]
+    )
+
+
+def mark_saturation(reports: List[StepReport]) -> Optional[StepReport]:
+    """Markiert gesättigte Stufen und gibt die erste davon zurück"""
+    if not reports:
+        return None
+    baseline_p95 = reports[0].p95_ms or None
+    first = None
+    for report in reports:
+        report.saturated = (
+            report.achieved_qps < 0.9 * report.offered_qps
+            or report.error_rate > 0.05
+            or (baseline_p95 is not None and report.p95_ms > 3 * baseline_p95)
+        )
+        if report.saturated and first is None:
+            first = report
+    return first
+
+
+def print_reports(reports: List[StepReport], saturation: Optional[StepReport]):
+    """Gibt die Auswertung als Tabelle aus"""
+    header = (
+        f"{'QPS':>7} {'erreicht':>9} {'Anfr.':>6} {'Fehler':>7} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'CPU s':>7} {'Kerne':>6} {'max RSS':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in reports:
+        marker = "  <- gesättigt" if r.saturated else ""
+        print(
+            f"{r.offered_qps:>7.2f} {r.achieved_qps:>9.2f} {r.requests:>6} "
+            f"{r.error_rate * 100:>6.1f}% {r.p50_ms:>9.1f} {r.p95_ms:>9.1f} {r.p99_ms:>9.1f} "
+            f"{r.cpu_seconds:>7.2f} {r.cpu_cores:>6.2f} {r.cumulative_peak_rss_mb:>8.1f}{marker}"
+        )
+        for error in r.error_samples:
+            print(f"        Fehler: {error}")
+    print()
+    if saturation:
+        print(
+            f"Sättigung ab {saturation.offered_qps:g} QPS "
+            f"(target={saturation.target}, max_concurrent={saturation.max_concurrent})"
+        )
+    else:
+        print("Keine Sättigung im gemessenen Bereich")
+
+
+async def run(args: argparse.Namespace) -> List[StepReport]:
+    """Startet Stand-ins und führt alle Laststufen nacheinander aus"""
+    entries = load_queries(args.queries)
+    for entry in entries:
+        entry.setdefault("max_results", args.max_results)
+
+    server = StandInServer(
+        page_latency=args.page_latency,
+        page_jitter=args.page_jitter,
+        page_paragraphs=args.page_paragraphs,
+        error_rate=args.site_error_rate,
+        seed=args.seed,
+        page_links=args.page_links
+    )
+    base_url = await server.start()
+
+    steps = [float(q) for q in args.qps_steps.split(",")] if args.qps_steps else [args.qps]
+    extra_args = []
+    if args.workers > 1:
+        extra_args += ["--workers", str(args.workers)]
+    if args.page_cache:
+        extra_args += ["--page-cache", args.page_cache]
+    if args.rerank:
+        extra_args += ["--rerank", "--ollama-url", base_url]
+        if args.embedding_cache:
+            extra_args += ["--embedding-cache", args.embedding_cache]
+    reports = []
+    try:
+        for qps in steps:
+            print(f"Laststufe {qps:g} QPS ({args.target}, {args.duration:g}s) ...", file=sys.stderr)
+            reports.append(await run_step(
+                args.target,
+                entries,
+                qps,
+                args.duration,
+                f"{base_url}/search",
+                args.max_concurrent,
+                args.timeout,
+                poisson=args.poisson,
+                seed=args.seed,
+                extra_args=extra_args,
+                workers=args.workers
+            ))
+    finally:
+        await server.stop()
+
+    print(f"Stand-in Anfragen: {server.requests}", file=sys.stderr)
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load-Replay für api_bridge.py mit lokalen Stand-ins"
+    )
+    parser.add_argument("--queries", help="Query-Log (Text oder JSONL, default: Beispiele)")
+    parser.add_argument("--target", choices=list(TARGETS), default="cli",
+                        help="cli (Prozess pro Anfrage) oder serve (langlebiger Prozess)")
+    parser.add_argument("--qps", type=float, default=1.0, help="Angebotene Rate (default: 1)")
+    parser.add_argument("--qps-steps", help="Kommagetrennte Raten für einen Sättigungs-Sweep, z.B. 1,2,4,8")
+    parser.add_argument("--duration", type=float, default=10.0, help="Dauer pro Stufe in Sekunden")
+    parser.add_argument("--poisson", action="store_true", help="Poisson-verteilte statt gleichmäßiger Ankünfte")
+    parser.add_argument("--max-concurrent", type=int, default=3, help="max_concurrent_requests der Bridge")
+    parser.add_argument("--workers", type=int, default=1, help="Worker-Prozesse der Bridge (nur serve)")
+    parser.add_argument("--page-cache", help="Seiten-Cache-Verzeichnis der Bridge")
+    parser.add_argument("--rerank", action="store_true", help="Embedding-Rerank mit Stand-in-Embeddings")
+    parser.add_argument("--embedding-cache", help="Embedding-Cache-Verzeichnis der Bridge (mit --rerank)")
+    parser.add_argument("--max-results", type=int, default=3, help="Ergebnisse pro Anfrage")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Timeout pro Anfrage in Sekunden")
+    parser.add_argument("--page-latency", type=float, default=0.2, help="Latenz der Stand-in-Seiten in s")
+    parser.add_argument("--page-jitter", type=float, default=0.1, help="Zufällige Zusatzlatenz in s")
+    parser.add_argument("--page-paragraphs", type=int, default=40, help="Absätze pro Stand-in-Seite")
+    parser.add_argument("--page-links", type=int, default=2, help="Content-Links pro Stand-in-Seite")
+    parser.add_argument("--site-error-rate", type=float, default=0.0, help="Anteil fehlerhafter Seiten")
+    parser.add_argument("--seed", type=int, default=42, help="Seed für Latenzen und Ankünfte")
+    parser.add_argument("--json", action="store_true", help="Ergebnis als JSON ausgeben")
+
+    args = parser.parse_args()
+
+    if args.target == "cli" and args.workers > 1:
+        parser.error("--workers erfordert --target serve")
+
+    if web is None:
+        print("aiohttp wird für die Stand-ins benötigt", file=sys.stderr)
+        sys.exit(1)
+
+    reports = asyncio.run(run(args))
+    saturation = mark_saturation(reports)
+
+    if args.json:
+        print(json.dumps({
+            "steps": [asdict(r) for r in reports],
+            "saturation_qps": saturation.offered_qps if saturation else None
+        }, ensure_ascii=False, indent=2))
+    else:
+        print_reports(reports, saturation)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+PageCache - Gemeinsamer Seiten-Cache auf der Festplatte
+=======================================================
+
+Transport für WebSearchIntegrator, der erfolgreiche Seitenabrufe (HTTP 200)
+in einem Verzeichnis ablegt. Mehrere Prozesse (z.B. die Worker des
+Supervisor-Modus von api_bridge.py) können denselben Cache nutzen:
+Einträge werden atomar geschrieben (temporäre Datei + os.replace), Leser
+sehen also nie halbe Dateien.
+
+Abgelaufene Einträge werden beim Lesen gelöscht. Zusätzlich räumt ein
+periodischer Sweep abgelaufene Dateien auf und löscht die ältesten Einträge,
+sobald das Verzeichnis die maximale Größe überschreitet.
+
+Der Cache kann einen weiteren Transport umschließen (z.B. ReplayTransport),
+Cache-Misses gehen dann an diesen statt direkt ins Netz.
+
+Verwendung:
+    transport = PageCacheTransport("/var/cache/websearch", ttl=3600)
+    async with WebSearchIntegrator(transport=transport) as integrator:
+        ...
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from websearch_integrator import FetchResponse, SearchResult, WebSearchIntegrator, logger
+from http_archive import Transport, LiveFetch, LiveSearch
+
+
+class PageCacheTransport(Transport):
+    """Cacht Seitenabrufe prozessübergreifend auf der Festplatte"""
+
+    def __init__(
+        self,
+        directory: str,
+        ttl: float = 3600.0,
+        inner: Optional[Transport] = None,
+        max_size_mb: float = 1024.0,
+        sweep_interval: float = 300.0
+    ):
+        """
+        Args:
+            directory: Cache-Verzeichnis (wird bei Bedarf angelegt)
+            ttl: Gültigkeit eines Eintrags in Sekunden
+            inner: Optionaler Transport für Cache-Misses und Suchen
+            max_size_mb: Maximale Größe des Verzeichnisses in MB
+            sweep_interval: Mindestabstand zwischen zwei Sweeps in Sekunden
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.inner = inner
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.sweep_interval = sweep_interval
+        self.hits = 0
+        self.misses = 0
+        self._last_sweep = time.monotonic()
+        self._sweep_task: Optional[asyncio.Future] = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(WebSearchIntegrator._normalize_url(url).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def _read(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                self._unlink(path)
+                return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _unlink(path: str):
+        # Andere Prozesse können dieselbe Datei gleichzeitig löschen
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _sweep(self) -> int:
+        """
+        Löscht abgelaufene Einträge und, über max_size, die ältesten.
+
+        Returns:
+            Anzahl gelöschter Dateien
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                # Übrig gebliebene temporäre Dateien zählen wie abgelaufene
+                if now - stat.st_mtime > self.ttl or (
+                    name.endswith(".tmp") and now - stat.st_mtime > 60
+                ):
+                    self._unlink(path)
+                    removed += 1
+                elif name.endswith(".json"):
+                    entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_size:
+            for _, size, path in sorted(entries):
+                self._unlink(path)
+                removed += 1
+                total -= size
+                if total <= self.max_size:
+                    break
+        return removed
+
+    def _maybe_sweep(self):
+        """Startet einen Sweep im Executor, wenn sweep_interval abgelaufen ist"""
+        if self._sweep_task is not None and not self._sweep_task.done():
+            return
+        if time.monotonic() - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = time.monotonic()
+        self._sweep_task = asyncio.get_running_loop().run_in_executor(None, self._sweep)
+        self._sweep_task.add_done_callback(self._sweep_done)
+
+    @staticmethod
+    def _sweep_done(task: asyncio.Future):
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.warning(f"Page-Cache: Sweep fehlgeschlagen ({task.exception()})")
+        elif task.result():
+            logger.info(f"Page-Cache: {task.result()} Einträge gelöscht")
+
+    def _write(self, path: str, entry: Dict[str, Any]):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Page-Cache: Schreiben fehlgeschlagen ({e})")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    async def search(
+        self,
+        query: str,
+        max_results: int,
+        region: str,
+        live: LiveSearch
+    ) -> List[SearchResult]:
+        if self.inner is not None:
+            return await self.inner.search(query, max_results, region, live)
+        return await live(query, max_results, region)
+
+    async def fetch(self, url: str, live: LiveFetch) -> FetchResponse:
+        loop = asyncio.get_running_loop()
+        path = self._path(url)
+
+        entry = await loop.run_in_executor(None, self._read, path)
+        if entry is not None:
+            self.hits += 1
+            return FetchResponse(
+                url=entry["url"],
+                status=entry["status"],
+                headers=entry["headers"],
+                body=base64.b64decode(entry["body"]),
+                encoding=entry.get("encoding"),
+                elapsed=0.0
+            )
+
+        self.misses += 1
+        if self.inner is not None:
+            response = await self.inner.fetch(url, live)
+        else:
+            response = await live(url)
+
+        if response.status == 200 and response.body:
+            await loop.run_in_executor(None, self._write, path, {
+                "url": response.url,
+                "status": response.status,
+                "headers": response.headers,
+                "body": base64.b64encode(response.body).decode("ascii"),
+                "encoding": response.encoding
+            })
+            self._maybe_sweep()
+        return response
+
+    def close(self):
+        if self.inner is not None:
+            self.inner.close()
+        logger.info(f"Page-Cache: {self.hits} Treffer, {self.misses} Misses")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+RequestProfiler - Opt-in Profiling einzelner Anfragen
+=====================================================
+
+Umschließt eine Anfrage mit cProfile und tracemalloc und schreibt pro
+gesampelter Anfrage drei Dateien in ein Verzeichnis:
+
+- <name>.collapsed  Collapsed Stacks (kompatibel mit flamegraph.pl/speedscope)
+- <name>.pstats     Rohdaten für pstats/snakeviz
+- <name>.alloc.txt  Top-Allokationsstellen laut tracemalloc
+
+Über sample_rate kann das Profiling dauerhaft in Produktion mit niedriger
+Rate laufen. cProfile und tracemalloc sind prozessweit: es wird daher immer
+nur eine Anfrage gleichzeitig profiliert, parallele Anfragen laufen in der
+Zeit ungemessen weiter (tauchen aber im Profil mit auf).
+
+Verwendung:
+    profiler = RequestProfiler("/tmp/profiles", sample_rate=0.01)
+    async with profiler.profile("research", query):
+        ...
+"""
+
+import asyncio
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger('WebSearchIntegrator')
+
+# pstats-Schlüssel: (Datei, Zeile, Funktionsname)
+FuncKey = Tuple[str, int, str]
+
+
+class RequestProfiler:
+    """
+    Profiliert gesampelte Anfragen mit cProfile und tracemalloc.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        sample_rate: float = 1.0,
+        top_allocations: int = 25,
+        traceback_frames: int = 10,
+        max_stack_depth: int = 64
+    ):
+        """
+        Initialisiert den RequestProfiler.
+
+        Args:
+            output_dir: Zielverzeichnis für die Profile
+            sample_rate: Anteil der Anfragen, die profiliert werden (0..1)
+            top_allocations: Anzahl der ausgegebenen Allokationsstellen
+            traceback_frames: Frames pro Allokation für tracemalloc
+            max_stack_depth: Maximale Tiefe der Collapsed Stacks
+        """
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.top_allocations = top_allocations
+        self.traceback_frames = traceback_frames
+        self.max_stack_depth = max_stack_depth
+        self._active = False
+
+    def should_sample(self) -> bool:
+        """Entscheidet, ob die nächste Anfrage profiliert wird"""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    @asynccontextmanager
+    async def profile(self, kind: str, label: str = ""):
+        """
+        Profiliert den umschlossenen Block, falls die Anfrage gesampelt wird.
+
+        Args:
+            kind: Art der Anfrage (z.B. "research"), Teil des Dateinamens
+            label: Freitext (z.B. die Query), Teil des Dateinamens
+        """
+        if self._active or not self.should_sample():
+            yield None
+            return
+
+        self._active = True
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(self.traceback_frames)
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield profiler
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            self._active = False
+
+            try:
+                # Auswertung und Schreiben im Executor, damit parallele
+                # Anfragen auf dem Event-Loop nicht warten müssen
+                loop = asyncio.get_running_loop()
+                path = await loop.run_in_executor(
+                    None, self._write, kind, label, profiler, snapshot, elapsed
+                )
+                logger.info(f"Profil geschrieben: {path} ({elapsed * 1000:.0f} ms)")
+            except OSError as e:
+                logger.error(f"Profil konnte nicht geschrieben werden: {e}")
+
+    def _write(
+        self,
+        kind: str,
+        label: str,
+        profiler: cProfile.Profile,
+        snapshot: tracemalloc.Snapshot,
+        elapsed: float
+    ) -> str:
+        """Schreibt Collapsed Stacks, pstats und Allokationen, gibt den Basispfad zurück"""
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', label).strip('-')[:40] or "request"
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(self.output_dir, f"{stamp}-{os.getpid()}-{kind}-{slug}")
+
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(f"{base}.pstats")
+
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            for stack, micros in collapse_stats(stats, self.max_stack_depth):
+                f.write(f"{stack} {micros}\n")
+
+        with open(f"{base}.alloc.txt", "w", encoding="utf-8") as f:
+            f.write(f"# {kind}: {label}\n")
+            f.write(f"# Dauer: {elapsed * 1000:.1f} ms\n\n")
+            for stat in snapshot.statistics('traceback')[:self.top_allocations]:
+                f.write(f"{stat.size / 1024:.1f} KiB in {stat.count} Blöcken\n")
+                for line in stat.traceback.format(most_recent_first=True):
+                    f.write(f"    {line}\n")
+                f.write("\n")
+
+        return base
+
+
+def _func_label(func: FuncKey) -> str:
+    """Lesbarer Name für einen pstats-Schlüssel"""
+    filename, line, name = func
+    if filename == '~':
+        return name.strip('<>').replace(' ', '_')
+    return f"{os.path.basename(filename)}:{name}:{line}".replace(';', ':').replace(' ', '_')
+
+
+def collapse_stats(stats: pstats.Stats, max_depth: int = 64) -> List[Tuple[str, int]]:
+    """
+    Erzeugt Collapsed Stacks aus einem cProfile-Aufrufgraphen.
+
+    cProfile speichert nur Kanten (Aufrufer -> Aufgerufener), keine
+    vollständigen Stacks. Die Eigenzeit jeder Funktion wird deshalb anteilig
+    (nach kumulierter Zeit je Kante) auf die Pfade von den Wurzeln aus
+    verteilt. Das ergibt eine Näherung, die für Flame Graphs ausreicht.
+
+    Args:
+        stats: pstats.Stats eines Profils
+        max_depth: Maximale Stack-Tiefe
+
+    Returns:
+        Liste von (Stack "a;b;c", Eigenzeit in Mikrosekunden)
+    """
+    raw: Dict[FuncKey, tuple] = stats.stats  # type: ignore[attr-defined]
+
+    callees: Dict[FuncKey, List[Tuple[FuncKey, float]]] = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    collapsed: Dict[str, float] = {}
+
+    def walk(func: FuncKey, path: List[FuncKey], share: float):
+        _, _, self_time, cumulative, _ = raw[func]
+        stack = ";".join(_func_label(f) for f in path)
+        collapsed[stack] = collapsed.get(stack, 0.0) + self_time * share
+
+        if len(path) >= max_depth:
+            return
+        for callee, edge_cumulative in callees.get(func, []):
+            callee_cumulative = raw[callee][3]
+            # Zyklen und vernachlässigbare Pfade (< 1 µs) nicht verfolgen
+            if callee in path or callee_cumulative <= 0 or share * edge_cumulative < 1e-6:
+                continue
+            walk(callee, path + [callee], share * edge_cumulative / callee_cumulative)
+
+    roots = [func for func, entry in raw.items() if not entry[4]]
+    for root in roots:
+        walk(root, [root], 1.0)
+
+    return [
+        (stack, int(seconds * 1_000_000))
+        for stack, seconds in sorted(collapsed.items())
+        if seconds * 1_000_000 >= 1
+    ]
+
+
+def profiler_from_env() -> Optional[RequestProfiler]:
+    """
+    Erstellt einen RequestProfiler aus Umgebungsvariablen.
+
+    WEBSEARCH_PROFILE_DIR aktiviert das Profiling,
+    WEBSEARCH_PROFILE_RATE setzt die Sampling-Rate (default: 1.0).
+    """
+    output_dir = os.environ.get("WEBSEARCH_PROFILE_DIR")
+    if not output_dir:
+        return None
+    rate = float(os.environ.get("WEBSEARCH_PROFILE_RATE", "1.0"))
+    return RequestProfiler(output_dir, sample_rate=rate)
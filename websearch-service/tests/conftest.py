@@ -0,0 +1,6 @@
+"""Gemeinsame Fixtures: Module aus websearch-service importierbar machen"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
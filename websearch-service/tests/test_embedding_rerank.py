@@ -0,0 +1,118 @@
+"""
+Tests für EmbeddingReranker gegen die Stand-in-Embeddings aus load_replay.py
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("aiohttp")
+
+from embedding_rerank import EmbeddingCache, EmbeddingReranker
+from load_replay import StandInServer
+from websearch_integrator import SearchResult, WebSearchIntegrator
+
+QUERY = "python asyncio event loop tutorial"
+
+PAGES = [
+    ("bundesliga", "Die Bundesliga Tabelle nach dem Spieltag. Bayern vor Dortmund."),
+    ("rezepte", "Nudeln mit Tomatensoße. Dazu frischer Basilikum und Parmesan."),
+    ("asyncio", "Ein Tutorial zu Python asyncio. Der event loop plant Coroutinen."),
+    ("python", "Python ist eine Programmiersprache. Sie ist leicht zu lernen."),
+]
+
+
+def make_results():
+    results = [
+        SearchResult(title=title, url=f"https://example.org/{title}", content=content,
+                     content_length=len(content), scrape_success=True)
+        for title, content in PAGES
+    ]
+    results.append(SearchResult(title="fehler", url="https://example.org/fehler",
+                                scrape_error="Timeout"))
+    return results
+
+
+def run_rerank(server_kwargs=None, cache_dir=None, rounds=1):
+    """Rerankt make_results() `rounds` Mal, gibt (Ergebnisse je Runde, Reranker, Server) zurück"""
+
+    async def scenario():
+        server = StandInServer(**(server_kwargs or {}))
+        base_url = await server.start()
+        integrator = WebSearchIntegrator()
+        reranker = EmbeddingReranker(base_url, model="stand-in", cache_dir=cache_dir)
+        try:
+            outputs = []
+            for _ in range(rounds):
+                outputs.append(await reranker.rerank(QUERY, make_results(), integrator))
+            return outputs, reranker, server
+        finally:
+            await reranker.close()
+            await server.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_rerank_orders_by_best_passage():
+    (ranked,), _, server = run_rerank()
+
+    titles = [r.title for r in ranked]
+    assert titles[0] == "asyncio"
+    assert titles[1] == "python"
+    # Ergebnisse ohne Content bleiben ohne Score am Ende
+    assert titles[-1] == "fehler"
+    assert ranked[-1].rerank_score is None
+
+    scores = [r.rerank_score for r in ranked[:-1]]
+    assert scores == sorted(scores, reverse=True)
+    assert server.requests["embed"] == 1
+    assert server.requests["embeddings"] == 0
+
+
+def test_fallback_to_single_embeddings_endpoint():
+    (ranked,), reranker, server = run_rerank({"embed_batch": False})
+
+    assert reranker._batch_endpoint is False
+    assert [r.title for r in ranked][:2] == ["asyncio", "python"]
+    assert server.requests["embed"] == 0
+    # Query plus eine Passage pro gescraptem Ergebnis
+    assert server.requests["embeddings"] == 1 + len(PAGES)
+
+
+def test_memory_cache_avoids_reembedding():
+    (first, second), _, server = run_rerank(rounds=2)
+
+    assert [r.title for r in first] == [r.title for r in second]
+    assert server.requests["embed"] == 1
+
+
+def test_disk_cache_avoids_reembedding(tmp_path):
+    (first,), _, first_server = run_rerank(cache_dir=str(tmp_path))
+    (second,), _, second_server = run_rerank(cache_dir=str(tmp_path))
+
+    assert first_server.requests["embed"] == 1
+    assert second_server.requests["embed"] == 0
+    assert [r.title for r in first] == [r.title for r in second]
+    assert [r.rerank_score for r in first] == pytest.approx([r.rerank_score for r in second])
+
+
+def test_memory_cache_is_bounded():
+    async def scenario():
+        server = StandInServer()
+        base_url = await server.start()
+        reranker = EmbeddingReranker(base_url, model="stand-in", memory_entries=3)
+        try:
+            await reranker.embed(["eins", "zwei", "drei"])
+            await reranker.embed(["eins", "vier"])
+            return list(reranker._memory), server.requests["embed"]
+        finally:
+            await reranker.close()
+            await server.stop()
+
+    keys, requests = asyncio.run(scenario())
+    # "zwei" wurde am längsten nicht genutzt und ist verdrängt
+    assert len(keys) == 3
+    assert EmbeddingCache.key("stand-in", "zwei") not in keys
+    assert keys[-1] == EmbeddingCache.key("stand-in", "vier")
+    assert requests == 2
@@ -24,21 +24,29 @@ Verwendung:
 """
 
 import asyncio
+import heapq
 import re
+import sys
+import time
 import json
 import hashlib
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass, field
-from urllib.parse import urljoin, urlparse
+from typing import List, Dict, Optional, Any, Awaitable, Callable, Tuple, TYPE_CHECKING
+from dataclasses import dataclass, field, replace
+from urllib.parse import urljoin, urlparse, urldefrag
 from datetime import datetime
 import logging
 
+if TYPE_CHECKING:
+    from request_profiler import RequestProfiler
+    from http_archive import Transport
+    from embedding_rerank import EmbeddingReranker
+
 # Für die Websuche
 try:
     from duckduckgo_search import DDGS
 except ImportError:
     DDGS = None
-    print("Warnung: duckduckgo-search nicht installiert. Bitte: pip install duckduckgo-search")
+    print("Warnung: duckduckgo-search nicht installiert. Bitte: pip install duckduckgo-search", file=sys.stderr)
 
 # Für async HTTP Requests
 try:
@@ -46,14 +54,14 @@ try:
     from aiohttp import ClientTimeout, ClientError
 except ImportError:
     aiohttp = None
-    print("Warnung: aiohttp nicht installiert. Bitte: pip install aiohttp")
+    print("Warnung: aiohttp nicht installiert. Bitte: pip install aiohttp", file=sys.stderr)
 
 # Für HTML Parsing
 try:
     from bs4 import BeautifulSoup
 except ImportError:
     BeautifulSoup = None
-    print("Warnung: beautifulsoup4 nicht installiert. Bitte: pip install beautifulsoup4")
+    print("Warnung: beautifulsoup4 nicht installiert. Bitte: pip install beautifulsoup4", file=sys.stderr)
 
 # Logging konfigurieren
 logging.basicConfig(
@@ -62,6 +70,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger('WebSearchIntegrator')
 
+# Marker, den _smart_truncate an gekürzte Inhalte anhängt
+TRUNCATION_MARKER = "[... Content gekürzt ...]"
+
+# Füllwörter, die bei der Bewertung gegen die Suchanfrage ignoriert werden
+STOPWORDS = {
+    "der", "die", "das", "den", "dem", "des", "ein", "eine", "einer", "und",
+    "oder", "ist", "sind", "war", "was", "wer", "wie", "wann", "warum",
+    "welche", "welcher", "welches", "für", "mit", "von", "bei", "aus", "auf",
+    "the", "and", "for", "what", "who", "when", "where", "which", "why",
+    "how", "are", "was", "with", "from",
+    "im", "in", "am", "an", "zu", "um", "so", "da", "ob", "es", "er", "wo",
+    "ab", "is", "of", "to", "on", "at", "by", "or", "it", "be", "do", "as",
+}
+
+
+@dataclass
+class Passage:
+    """Satzbündiger Textabschnitt eines Ergebnisses (für den Vector-Store)"""
+    url: str
+    index: int
+    start: int
+    end: int
+    text: str
+    content_hash: str
+
+
+@dataclass
+class Link:
+    """Link aus dem Haupt-Content einer Seite"""
+    url: str
+    text: str = ""
+
 
 @dataclass
 class SearchResult:
@@ -73,9 +113,39 @@ class SearchResult:
     content_length: int = 0
     scrape_success: bool = False
     scrape_error: Optional[str] = None
+    passages: List[Passage] = field(default_factory=list)
+    links: List[Link] = field(default_factory=list)
+    from_snippet: bool = False
+    rerank_score: Optional[float] = None
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
 
 
+@dataclass
+class FetchResponse:
+    """Antwort eines HTTP-Abrufs (unabhängig von Live-Netz oder Archiv)"""
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes = b""
+    encoding: Optional[str] = None
+    elapsed: float = 0.0
+    
+    def header(self, name: str, default: str = "") -> str:
+        """Liest einen Header ohne Beachtung der Groß-/Kleinschreibung"""
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return default
+    
+    def text(self) -> str:
+        """Dekodiert den Body mit dem Encoding der Antwort"""
+        try:
+            return self.body.decode(self.encoding or 'utf-8', errors='replace')
+        except LookupError:
+            return self.body.decode('utf-8', errors='replace')
+
+
 @dataclass
 class WebSearchContext:
     """Der finale Kontext für Ollama"""
@@ -85,7 +155,101 @@ class WebSearchContext:
     total_sources: int
     successful_scrapes: int
     failed_scrapes: int
+    path: str = "scrape"
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    # Nur mit expand_context=False: Kontext als Segmente (siehe
+    # build_context_segments), combined_context bleibt dann leer
+    context_segments: Optional[List[Any]] = None
+
+
+def expand_context_segments(segments: List[Any], results: List[Any]) -> str:
+    """
+    Setzt Kontext-Segmente wieder zu einem String zusammen.
+    
+    Args:
+        segments: Zeilen (str) und Ergebnis-Indizes (int)
+        results: SearchResult-Objekte oder Dicts mit "content"
+        
+    Returns:
+        Formatierter Kontext-String
+    """
+    lines = []
+    for segment in segments:
+        if isinstance(segment, int):
+            result = results[segment]
+            content = result.get('content') if isinstance(result, dict) else result.content
+            lines.append(content or "")
+        else:
+            lines.append(segment)
+    return "\n".join(lines)
+
+
+class CrawlFrontier:
+    """
+    Priorisierte Crawl-Frontier mit einer Queue pro Host.
+    
+    Jeder Host hat einen eigenen Heap; pop() wählt den am höchsten bewerteten
+    Eintrag über alle Hosts, die noch Kapazität haben. Das Seen-Set sorgt
+    dafür, dass jede (normalisierte) URL höchstens einmal eingereiht wird.
+    """
+    
+    def __init__(self, max_pages_per_host: int = 4, max_inflight_per_host: int = 1):
+        """
+        Args:
+            max_pages_per_host: Maximale Anzahl Seiten pro Host
+            max_inflight_per_host: Maximale gleichzeitige Abrufe pro Host
+        """
+        self.max_pages_per_host = max_pages_per_host
+        self.max_inflight_per_host = max_inflight_per_host
+        self.seen: set = set()
+        self._queues: Dict[str, List[tuple]] = {}
+        self._started: Dict[str, int] = {}
+        self._inflight: Dict[str, int] = {}
+        self._counter = 0
+    
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+    
+    def push(self, url: str, score: float, depth: int) -> bool:
+        """Reiht eine URL ein, falls sie noch nicht gesehen wurde"""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        host = urlparse(url).netloc.lower()
+        self._counter += 1
+        heapq.heappush(self._queues.setdefault(host, []), (-score, self._counter, url, depth))
+        return True
+    
+    def pop(self) -> Optional[Tuple[str, int, float]]:
+        """
+        Entnimmt die beste URL eines Hosts mit freier Kapazität.
+        
+        Returns:
+            (url, depth, score) oder None, falls aktuell nichts abrufbar ist
+        """
+        best_host = None
+        for host, queue in self._queues.items():
+            if not queue:
+                continue
+            if self._started.get(host, 0) >= self.max_pages_per_host:
+                continue
+            if self._inflight.get(host, 0) >= self.max_inflight_per_host:
+                continue
+            if best_host is None or queue[0] < self._queues[best_host][0]:
+                best_host = host
+        
+        if best_host is None:
+            return None
+        
+        neg_score, _, url, depth = heapq.heappop(self._queues[best_host])
+        self._started[best_host] = self._started.get(best_host, 0) + 1
+        self._inflight[best_host] = self._inflight.get(best_host, 0) + 1
+        return url, depth, -neg_score
+    
+    def done(self, url: str):
+        """Markiert den Abruf einer URL als abgeschlossen"""
+        host = urlparse(url).netloc.lower()
+        self._inflight[host] = max(0, self._inflight.get(host, 0) - 1)
 
 
 class WebSearchIntegrator:
@@ -104,7 +268,12 @@ class WebSearchIntegrator:
         max_concurrent_requests: int = 3,
         request_timeout: int = 10,
         max_content_length: int = 4000,
-        user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+        coalesce_requests: bool = True,
+        search_url: Optional[str] = None,
+        profiler: Optional["RequestProfiler"] = None,
+        transport: Optional["Transport"] = None,
+        reranker: Optional["EmbeddingReranker"] = None
     ):
         """
         Initialisiert den WebSearchIntegrator.
@@ -114,15 +283,33 @@ class WebSearchIntegrator:
             request_timeout: Timeout pro Request in Sekunden
             max_content_length: Maximale Länge pro gescrapeten Content
             user_agent: User-Agent für HTTP Requests
+            coalesce_requests: Gleichzeitige identische Suchen/Downloads bündeln
+            search_url: Optionaler HTTP-Suchendpunkt statt DuckDuckGo
+                (GET ?q=&max_results=&region=, liefert JSON im DDGS-Format)
+            profiler: Optionaler RequestProfiler für gesampeltes Profiling
+            transport: Optionaler Transport für Suche und Abrufe
+                (z.B. Aufzeichnung/Wiedergabe, siehe http_archive)
+            reranker: Optionaler EmbeddingReranker, der die Quellen vor dem
+                Kontext-Building nach Relevanz sortiert
         """
         self.max_concurrent_requests = max_concurrent_requests
         self.request_timeout = request_timeout
         self.max_content_length = max_content_length
         self.user_agent = user_agent
+        self.coalesce_requests = coalesce_requests
+        self.search_url = search_url
+        self.profiler = profiler
+        self.transport = transport
+        self.reranker = reranker
         
         # Semaphore für Limitierung paralleler Requests
         self.semaphore = asyncio.Semaphore(max_concurrent_requests)
         
+        # Laufende Suchen/Downloads (Single-Flight): Key -> gemeinsame Future
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Anzahl wartender Aufrufer je gemeinsamer Future
+        self._waiters: Dict[asyncio.Future, int] = {}
+        
         # Session wird lazy initialisiert
         self.session: Optional[aiohttp.ClientSession] = None
         
@@ -146,6 +333,69 @@ class WebSearchIntegrator:
             )
         return self.session
     
+    async def _single_flight(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Führt `factory` aus oder hängt sich an einen laufenden Aufruf mit
+        demselben Key an.
+        
+        Gleichzeitige Aufrufer teilen sich eine Future. Der Abbruch eines
+        einzelnen Aufrufers bricht die gemeinsame Arbeit nicht ab; erst wenn
+        der letzte wartende Aufrufer abgebrochen wird, wird auch sie
+        abgebrochen (z.B. bei abgelaufenem Crawl-Zeitbudget).
+        
+        Args:
+            key: Normalisierter Schlüssel der Anfrage
+            factory: Erzeugt die eigentliche Coroutine
+            
+        Returns:
+            Ergebnis der (geteilten) Coroutine
+        """
+        if not self.coalesce_requests:
+            return await factory()
+        
+        future = self._inflight.get(key)
+        if future is not None:
+            logger.debug(f"Single-Flight: hänge an laufende Anfrage an ({key})")
+        else:
+            future = asyncio.ensure_future(factory())
+            self._inflight[key] = future
+            self._waiters[future] = 0
+            
+            def _cleanup(done: asyncio.Future):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+                self._waiters.pop(done, None)
+                # Exception abholen, falls alle Aufrufer abgebrochen wurden
+                if not done.cancelled():
+                    done.exception()
+            
+            future.add_done_callback(_cleanup)
+        
+        self._waiters[future] += 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            remaining = self._waiters.get(future, 1) - 1
+            if future in self._waiters:
+                self._waiters[future] = remaining
+            if remaining == 0 and not future.done():
+                # Letzter Aufrufer abgebrochen: gemeinsame Arbeit abbrechen
+                future.cancel()
+    
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Normalisiert eine Suchanfrage für das Request-Coalescing"""
+        return " ".join(query.lower().split())
+    
+    @staticmethod
+    def _normalize_url(url: str) -> str:
+        """Normalisiert eine URL für das Request-Coalescing (ohne Fragment)"""
+        return urldefrag(url.strip())[0]
+    
     async def search(
         self,
         query: str,
@@ -163,37 +413,190 @@ class WebSearchIntegrator:
         Returns:
             Liste von SearchResult-Objekten (noch ohne Content)
         """
+        key = f"search:{region}:{max_results}:{self._normalize_query(query)}"
+        results = await self._single_flight(
+            key,
+            lambda: self._run_search(query, max_results, region)
+        )
+        # Kopien zurückgeben, da Aufrufer die Ergebnisse weiterverändern
+        return [replace(r) for r in results]
+    
+    async def _run_search(
+        self,
+        query: str,
+        max_results: int,
+        region: str
+    ) -> List[SearchResult]:
+        """Führt die eigentliche Suche aus (ohne Coalescing)"""
+        if self.transport is not None:
+            return await self.transport.search(query, max_results, region, self._live_search)
+        return await self._live_search(query, max_results, region)
+    
+    async def _live_search(
+        self,
+        query: str,
+        max_results: int,
+        region: str
+    ) -> List[SearchResult]:
+        """Sucht live über DuckDuckGo bzw. search_url"""
+        if self.search_url:
+            return await self._http_search(query, max_results, region)
+        
         if DDGS is None:
             raise ImportError("duckduckgo-search ist nicht installiert")
         
         logger.info(f"Starte Websuche für: '{query}'")
         
         try:
-            with DDGS() as ddgs:
-                results = []
+            # DDGS ist synchron: im Executor ausführen, damit der Event-Loop
+            # (und parallele Anfragen) nicht blockiert werden
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(
+                None,
+                self._ddgs_text,
+                query,
+                max_results,
+                region
+            )
+            
+            logger.info(f"Suche ergab {len(results)} Ergebnisse")
+            return results
+                
+        except Exception as e:
+            logger.error(f"Fehler bei der Websuche: {e}")
+            raise
+    
+    async def _http_search(
+        self,
+        query: str,
+        max_results: int,
+        region: str
+    ) -> List[SearchResult]:
+        """
+        Sucht über einen HTTP-Endpunkt im DDGS-Format (z.B. lokale
+        Stand-ins für Lasttests).
+        
+        Args:
+            query: Suchbegriff
+            max_results: Maximale Anzahl Ergebnisse
+            region: Region für Suche
+            
+        Returns:
+            Liste von SearchResult-Objekten (noch ohne Content)
+        """
+        logger.info(f"Starte Websuche für: '{query}' ({self.search_url})")
+        
+        try:
+            session = await self._get_session()
+            params = {'q': query, 'max_results': str(max_results), 'region': region}
+            async with session.get(self.search_url, params=params) as response:
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+            
+            results = [self._result_from_ddgs(r) for r in data[:max_results]]
+            logger.info(f"Suche ergab {len(results)} Ergebnisse")
+            return results
+            
+        except Exception as e:
+            logger.error(f"Fehler bei der Websuche: {e}")
+            raise
+    
+    @staticmethod
+    def _result_from_ddgs(r: Dict[str, Any]) -> SearchResult:
+        """Wandelt ein Ergebnis im DDGS-Format in ein SearchResult um"""
+        return SearchResult(
+            title=r.get('title', ''),
+            url=r.get('href', ''),
+            snippet=r.get('body', '')
+        )
+    
+    @staticmethod
+    def _ddgs_text(query: str, max_results: int, region: str) -> List[SearchResult]:
+        """Synchroner DuckDuckGo-Aufruf"""
+        with DDGS() as ddgs:
+            return [
+                WebSearchIntegrator._result_from_ddgs(r)
                 for r in ddgs.text(
                     query,
                     region=region,
                     safesearch='off',
                     max_results=max_results
-                ):
-                    results.append(SearchResult(
-                        title=r.get('title', ''),
-                        url=r.get('href', ''),
-                        snippet=r.get('body', '')
-                    ))
-                
-                logger.info(f"Suche ergab {len(results)} Ergebnisse")
-                return results
-                
-        except Exception as e:
-            logger.error(f"Fehler bei der Websuche: {e}")
-            raise
+                )
+            ]
     
-    async def _scrape_url(self, url: str) -> SearchResult:
+    async def _scrape_url(
+        self,
+        url: str,
+        max_content_length: Optional[int] = None
+    ) -> SearchResult:
         """
         Scraped eine einzelne URL und extrahiert den Content.
         
+        Gleichzeitige Aufrufe für dieselbe URL teilen sich Download und
+        Parsing; gekürzt wird danach für jeden Aufrufer einzeln.
+        
+        Args:
+            url: Ziel-URL
+            max_content_length: Maximale Content-Länge (default: self.max_content_length)
+            
+        Returns:
+            SearchResult mit extrahiertem Content
+        """
+        max_content_length = max_content_length or self.max_content_length
+        result = await self._single_flight(
+            f"scrape:{self._normalize_url(url)}",
+            lambda: self._fetch_and_parse(url)
+        )
+        result = replace(result)
+        
+        # Länge limitieren
+        if len(result.content) > max_content_length:
+            result.content = self._smart_truncate(result.content, max_content_length)
+            result.content_length = len(result.content)
+        return result
+    
+    async def _fetch(self, url: str) -> FetchResponse:
+        """Ruft eine URL über den Transport bzw. live ab"""
+        if self.transport is not None:
+            return await self.transport.fetch(url, self._live_fetch)
+        return await self._live_fetch(url)
+    
+    async def _live_fetch(self, url: str) -> FetchResponse:
+        """
+        Ruft eine URL über die aiohttp Session ab.
+        
+        Der Body wird nur bei HTTP 200 und HTML gelesen, andere Antworten
+        werden ohnehin verworfen.
+        """
+        session = await self._get_session()
+        start = time.perf_counter()
+        
+        async with session.get(url, allow_redirects=True) as response:
+            headers = dict(response.headers.items())
+            body = b""
+            encoding = None
+            content_type = response.headers.get('Content-Type', '').lower()
+            if response.status == 200 and 'text/html' in content_type:
+                body = await response.read()
+                try:
+                    encoding = response.get_encoding()
+                except RuntimeError:
+                    encoding = None
+            
+            return FetchResponse(
+                url=str(response.url),
+                status=response.status,
+                headers=headers,
+                body=body,
+                encoding=encoding,
+                elapsed=time.perf_counter() - start
+            )
+    
+    async def _fetch_and_parse(self, url: str) -> SearchResult:
+        """
+        Lädt eine URL und extrahiert den Content (ohne Coalescing und
+        ungekürzt, siehe _scrape_url).
+        
         Args:
             url: Ziel-URL
             
@@ -204,22 +607,20 @@ class WebSearchIntegrator:
             result = SearchResult(title="", url=url)
             
             try:
-                session = await self._get_session()
-                
                 logger.debug(f"Scrape: {url}")
                 
-                async with session.get(url, allow_redirects=True) as response:
-                    if response.status != 200:
-                        result.scrape_error = f"HTTP {response.status}"
-                        return result
-                    
-                    # Content-Type prüfen
-                    content_type = response.headers.get('Content-Type', '').lower()
-                    if 'text/html' not in content_type:
-                        result.scrape_error = f"Nicht-HTML Content: {content_type}"
-                        return result
-                    
-                    html = await response.text()
+                response = await self._fetch(url)
+                if response.status != 200:
+                    result.scrape_error = f"HTTP {response.status}"
+                    return result
+                
+                # Content-Type prüfen
+                content_type = response.header('Content-Type').lower()
+                if 'text/html' not in content_type:
+                    result.scrape_error = f"Nicht-HTML Content: {content_type}"
+                    return result
+                
+                html = response.text()
                     
             except asyncio.TimeoutError:
                 result.scrape_error = "Timeout"
@@ -240,25 +641,16 @@ class WebSearchIntegrator:
                 result.scrape_error = "BeautifulSoup nicht installiert"
                 return result
             
-            cleaned_text = self._clean_html(html, url)
-            
-            # Länge limitieren
-            if len(cleaned_text) > self.max_content_length:
-                cleaned_text = self._smart_truncate(
-                    cleaned_text, 
-                    self.max_content_length
-                )
+            cleaned_text, title, links = self._parse_html(html, url)
             
             result.content = cleaned_text
             result.content_length = len(cleaned_text)
+            result.links = links
             result.scrape_success = True
             
-            # Title aus HTML extrahieren falls noch nicht gesetzt
+            # Title aus HTML übernehmen falls noch nicht gesetzt
             if not result.title:
-                soup = BeautifulSoup(html, 'html.parser')
-                title_tag = soup.find('title')
-                if title_tag:
-                    result.title = title_tag.get_text(strip=True)
+                result.title = title
             
             logger.debug(f"Erfolgreich gescraped: {url} ({len(cleaned_text)} chars)")
             
@@ -279,8 +671,24 @@ class WebSearchIntegrator:
         Returns:
             Bereinigter Text
         """
+        return self._parse_html(html, base_url)[0]
+    
+    def _parse_html(self, html: str, base_url: str) -> Tuple[str, str, List[Link]]:
+        """
+        Parst HTML einmal und liefert Text, Titel und Links des Haupt-Contents.
+        
+        Args:
+            html: Rohes HTML
+            base_url: Basis-URL für relative Links
+            
+        Returns:
+            (bereinigter Text, Titel, Links im Haupt-Content)
+        """
         soup = BeautifulSoup(html, 'html.parser')
         
+        title_tag = soup.find('title')
+        title = title_tag.get_text(strip=True) if title_tag else ""
+        
         # Unnötige Elemente entfernen
         for element in soup.find_all(['script', 'style', 'nav', 'footer', 
                                        'header', 'aside', 'advertisement',
@@ -319,7 +727,31 @@ class WebSearchIntegrator:
         # Bereinigung
         text = self._clean_text(text)
         
-        return text
+        return text, title, self._extract_links(main_content, base_url)
+    
+    def _extract_links(self, element: Any, base_url: str) -> List[Link]:
+        """
+        Sammelt HTTP(S)-Links aus einem HTML-Element.
+        
+        Args:
+            element: BeautifulSoup-Element (Haupt-Content)
+            base_url: Basis-URL für relative Links
+            
+        Returns:
+            Liste eindeutiger Links (absolut, ohne Fragment)
+        """
+        page_url = self._normalize_url(base_url)
+        seen = set()
+        links = []
+        for anchor in element.find_all('a', href=True):
+            url = self._normalize_url(urljoin(base_url, anchor['href']))
+            if urlparse(url).scheme not in ('http', 'https'):
+                continue
+            if url == page_url or url in seen:
+                continue
+            seen.add(url)
+            links.append(Link(url=url, text=anchor.get_text(' ', strip=True)))
+        return links
     
     def _clean_text(self, text: str) -> str:
         """
@@ -373,22 +805,119 @@ class WebSearchIntegrator:
         for i in range(max_length - 1, max_length - 200, -1):
             if i < 0:
                 break
-            if text[i] in '.!?' and i + 1 < len(text) and text[i + 1] in ' \n':
+            if self._is_sentence_end(text, i):
                 truncate_at = i + 1
                 break
         
         truncated = text[:truncate_at].strip()
-        return f"{truncated}\n\n[... Content gekürzt ...]"
+        return f"{truncated}\n\n{TRUNCATION_MARKER}"
+    
+    @staticmethod
+    def _is_sentence_end(text: str, i: int) -> bool:
+        """Prüft, ob an Position i ein Satz endet (Satzzeichen + Whitespace)"""
+        return text[i] in '.!?' and i + 1 < len(text) and text[i + 1] in ' \n'
+    
+    def _sentence_spans(self, text: str) -> List[tuple]:
+        """
+        Zerlegt Text in Sätze bzw. Zeilen.
+        
+        Args:
+            text: Bereinigter Text
+            
+        Returns:
+            Liste von (start, end)-Offsets ohne umgebenden Whitespace
+        """
+        spans = []
+        start = 0
+        for i, char in enumerate(text):
+            if char == '\n' or self._is_sentence_end(text, i):
+                spans.append((start, i + 1))
+                start = i + 1
+        spans.append((start, len(text)))
+        
+        stripped = []
+        for start, end in spans:
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if start < end:
+                stripped.append((start, end))
+        return stripped
+    
+    def chunk_passages(self, result: SearchResult, max_chars: int = 800) -> List[Passage]:
+        """
+        Teilt den Content eines Ergebnisses in satzbündige Passagen.
+        
+        Sätze werden zusammengefasst, solange die Passage max_chars nicht
+        überschreitet; überlange Sätze werden an Leerzeichen getrennt.
+        Offsets beziehen sich auf result.content, der Hash (SHA-256 des
+        Passagentexts) erlaubt es, bereits eingebettete Passagen zu überspringen.
+        
+        Args:
+            result: Gescraptes SearchResult
+            max_chars: Maximale Länge einer Passage
+            
+        Returns:
+            Liste von Passage-Objekten (ValueError bei max_chars <= 0)
+        """
+        if max_chars <= 0:
+            raise ValueError(f"max_chars muss größer als 0 sein (ist {max_chars})")
+        
+        text = result.content
+        if text.endswith(TRUNCATION_MARKER):
+            text = text[:-len(TRUNCATION_MARKER)]
+        
+        # Überlange Sätze vorab an Leerzeichen aufteilen
+        pieces = []
+        for start, end in self._sentence_spans(text):
+            while end - start > max_chars:
+                cut = text.rfind(' ', start, start + max_chars)
+                if cut <= start:
+                    cut = start + max_chars
+                pieces.append((start, cut))
+                start = cut
+                while start < end and text[start].isspace():
+                    start += 1
+            if start < end:
+                pieces.append((start, end))
+        
+        # Sätze zu Passagen bündeln
+        bounds = []
+        for start, end in pieces:
+            if bounds and end - bounds[-1][0] <= max_chars:
+                bounds[-1] = (bounds[-1][0], end)
+            else:
+                bounds.append((start, end))
+        
+        passages = []
+        for index, (start, end) in enumerate(bounds):
+            passage_text = result.content[start:end]
+            passages.append(Passage(
+                url=result.url,
+                index=index,
+                start=start,
+                end=end,
+                text=passage_text,
+                content_hash=hashlib.sha256(passage_text.encode('utf-8')).hexdigest()
+            ))
+        return passages
     
     async def scrape_results(
         self,
-        results: List[SearchResult]
+        results: List[SearchResult],
+        passage_size: Optional[int] = None,
+        max_content_length: Optional[int] = None
     ) -> List[SearchResult]:
         """
         Scraped alle URLs aus den Suchergebnissen parallel.
         
         Args:
             results: Liste von SearchResult-Objekten
+            passage_size: Falls gesetzt, Content zusätzlich in Passagen
+                dieser Maximallänge teilen (result.passages)
+            max_content_length: Maximale Content-Länge pro URL
+                (default: self.max_content_length)
             
         Returns:
             Liste mit gescrapeten Inhalten
@@ -396,7 +925,7 @@ class WebSearchIntegrator:
         logger.info(f"Starte paralleles Scraping von {len(results)} URLs")
         
         # Parallel scraping
-        tasks = [self._scrape_url(result.url) for result in results]
+        tasks = [self._scrape_url(result.url, max_content_length) for result in results]
         scraped_results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Ergebnisse zusammenführen (Title und Snippet aus Original beibehalten)
@@ -412,6 +941,11 @@ class WebSearchIntegrator:
                 scraped.snippet = original.snippet
                 final_results.append(scraped)
         
+        if passage_size:
+            for result in final_results:
+                if result.scrape_success:
+                    result.passages = self.chunk_passages(result, passage_size)
+        
         successful = sum(1 for r in final_results if r.scrape_success)
         logger.info(f"Scraping abgeschlossen: {successful}/{len(final_results)} erfolgreich")
         
@@ -434,7 +968,43 @@ class WebSearchIntegrator:
         Returns:
             Formatierter Kontext-String
         """
-        context_parts = []
+        segments = self.build_context_segments(query, results, include_failed)
+        return expand_context_segments(segments, results)
+    
+    def _context_fields(
+        self,
+        query: str,
+        results: List[SearchResult],
+        expand_context: bool
+    ) -> Dict[str, Any]:
+        """Kontext-Felder für WebSearchContext (String oder nur Segmente)"""
+        segments = self.build_context_segments(query, results)
+        if not expand_context:
+            return {"combined_context": "", "context_segments": segments}
+        return {"combined_context": expand_context_segments(segments, results)}
+    
+    def build_context_segments(
+        self,
+        query: str,
+        results: List[SearchResult],
+        include_failed: bool = False
+    ) -> List[Any]:
+        """
+        Baut den Kontext als Liste von Zeilen und Content-Referenzen.
+        
+        Strings sind fertige Zeilen, Integer verweisen auf den Index des
+        Ergebnisses in `results`, dessen Content an dieser Stelle steht.
+        So muss der gescrapte Text nicht doppelt serialisiert werden.
+        
+        Args:
+            query: Ursprüngliche Suchanfrage
+            results: Liste der Suchergebnisse mit Content
+            include_failed: Auch fehlgeschlagene Scrapes auflisten
+            
+        Returns:
+            Liste aus Strings und Ergebnis-Indizes
+        """
+        context_parts: List[Any] = []
         
         # Header
         context_parts.append("=" * 60)
@@ -445,26 +1015,33 @@ class WebSearchIntegrator:
         context_parts.append("")
         
         # Erfolgreiche Scrapes
-        successful_results = [r for r in results if r.scrape_success]
+        successful_results = [
+            (index, r) for index, r in enumerate(results)
+            if r.scrape_success or r.from_snippet
+        ]
         
         if successful_results:
             context_parts.append(f"Gefundene Quellen ({len(successful_results)}):")
             context_parts.append("-" * 60)
             context_parts.append("")
             
-            for i, result in enumerate(successful_results, 1):
+            for i, (index, result) in enumerate(successful_results, 1):
                 context_parts.append(f"[{i}] {result.title}")
                 context_parts.append(f"    URL: {result.url}")
                 context_parts.append(f"    Länge: {result.content_length} Zeichen")
+                if result.from_snippet:
+                    context_parts.append("    Hinweis: nur Such-Snippet, Seite nicht gescraped")
                 context_parts.append("")
-                context_parts.append(result.content)
+                context_parts.append(index)
                 context_parts.append("")
                 context_parts.append("-" * 60)
                 context_parts.append("")
         
         # Fehlgeschlagene Scrapes (optional)
         if include_failed:
-            failed_results = [r for r in results if not r.scrape_success]
+            failed_results = [
+                r for r in results if not r.scrape_success and not r.from_snippet
+            ]
             if failed_results:
                 context_parts.append("Nicht verfügbare Quellen:")
                 for result in failed_results:
@@ -479,13 +1056,15 @@ class WebSearchIntegrator:
         context_parts.append("Nutze die oben genannten Informationen, um die Frage zu beantworten.")
         context_parts.append("Zitiere relevante Quellen mit ihrer Nummer [1], [2], etc.")
         
-        return "\n".join(context_parts)
+        return context_parts
     
     async def search_and_build_context(
         self,
         query: str,
         max_results: int = 5,
-        max_content_length: Optional[int] = None
+        max_content_length: Optional[int] = None,
+        passage_size: Optional[int] = None,
+        expand_context: bool = True
     ) -> WebSearchContext:
         """
         Kompletter Workflow: Suche → Scraping → Kontext-Building.
@@ -496,13 +1075,32 @@ class WebSearchIntegrator:
             query: Suchbegriff
             max_results: Anzahl der zu scrapenden Ergebnisse
             max_content_length: Maximale Content-Länge pro URL
+            passage_size: Optionale Maximallänge für Passagen (siehe chunk_passages)
+            expand_context: False = nur Kontext-Segmente statt combined_context
+                (für das kompakte Output-Format)
             
         Returns:
             WebSearchContext mit allen Informationen
         """
-        if max_content_length:
-            self.max_content_length = max_content_length
+        if self.profiler is None:
+            return await self._search_and_build_context(
+                query, max_results, max_content_length, passage_size, expand_context
+            )
         
+        async with self.profiler.profile("research", query):
+            return await self._search_and_build_context(
+                query, max_results, max_content_length, passage_size, expand_context
+            )
+    
+    async def _search_and_build_context(
+        self,
+        query: str,
+        max_results: int,
+        max_content_length: Optional[int],
+        passage_size: Optional[int] = None,
+        expand_context: bool = True
+    ) -> WebSearchContext:
+        """Workflow ohne Profiling (siehe search_and_build_context)"""
         try:
             # 1. Suche durchführen
             search_results = await self.search(query, max_results)
@@ -519,10 +1117,12 @@ class WebSearchIntegrator:
                 )
             
             # 2. URLs scrapen
-            scraped_results = await self.scrape_results(search_results)
+            scraped_results = await self.scrape_results(
+                search_results, passage_size, max_content_length
+            )
             
             # 3. Kontext bauen
-            context = self.build_context(query, scraped_results)
+            scraped_results = await self._rerank(query, scraped_results)
             
             # Statistiken
             successful = sum(1 for r in scraped_results if r.scrape_success)
@@ -531,18 +1131,417 @@ class WebSearchIntegrator:
             return WebSearchContext(
                 query=query,
                 results=scraped_results,
-                combined_context=context,
                 total_sources=len(scraped_results),
                 successful_scrapes=successful,
-                failed_scrapes=failed
+                failed_scrapes=failed,
+                **self._context_fields(query, scraped_results, expand_context)
             )
             
         except Exception as e:
             logger.error(f"Fehler im Workflow: {e}")
             raise
     
+    @staticmethod
+    def _query_terms(query: str) -> set:
+        """
+        Relevante Suchbegriffe (klein geschrieben, mind. 2 Zeichen, ohne Füllwörter).
+        
+        Zweibuchstabige Begriffe zählen mit, damit kurze Faktenfragen wie
+        "Was ist KI?" überhaupt Suchbegriffe haben.
+        """
+        return {
+            term for term in re.findall(r'\w+', query.lower())
+            if len(term) >= 2 and term not in STOPWORDS
+        }
+    
+    @staticmethod
+    def _term_coverage(terms: set, text: str) -> float:
+        """Anteil der Suchbegriffe, die im Text vorkommen (0..1)"""
+        if not terms:
+            return 0.0
+        words = set(re.findall(r'\w+', text.lower()))
+        return len(terms & words) / len(terms)
+    
+    def _score_link(self, terms: set, link: Link, page_relevance: float, depth: int) -> float:
+        """
+        Bewertet einen Link gegen die Suchanfrage.
+        
+        Ankertext zählt am stärksten, dann die URL, dann die Relevanz der
+        Seite, auf der der Link gefunden wurde. Tiefe wird leicht bestraft.
+        """
+        return (
+            2.0 * self._term_coverage(terms, link.text)
+            + self._term_coverage(terms, link.url.replace('-', ' ').replace('_', ' '))
+            + 0.5 * page_relevance
+            - 0.1 * depth
+        )
+    
+    async def crawl(
+        self,
+        query: str,
+        seeds: Optional[List[SearchResult]] = None,
+        max_results: int = 3,
+        max_pages: int = 10,
+        max_depth: int = 2,
+        time_budget: float = 30.0,
+        max_pages_per_host: int = 4,
+        max_content_length: Optional[int] = None
+    ) -> List[SearchResult]:
+        """
+        Crawlt ausgehend von den Suchergebnissen entlang der Content-Links.
+        
+        Seiten werden nach ihrer Bewertung gegen die Suchanfrage aus einer
+        Frontier mit Queue pro Host abgerufen, parallel über die gemeinsame
+        Session (begrenzt durch max_concurrent_requests). Der Crawl endet,
+        wenn Seiten- oder Zeitbudget erschöpft sind oder die Frontier leer ist.
+        
+        Args:
+            query: Suchbegriff (Bewertung der Links)
+            seeds: Start-Ergebnisse (default: eigene Suche mit max_results)
+            max_results: Anzahl der Suchergebnisse als Startpunkte
+            max_pages: Maximale Anzahl abgerufener Seiten (inkl. Startpunkte)
+            max_depth: Maximale Link-Tiefe ab den Startpunkten
+            time_budget: Zeitbudget in Sekunden
+            max_pages_per_host: Maximale Anzahl Seiten pro Host
+            max_content_length: Maximale Content-Länge pro URL
+                (default: self.max_content_length)
+            
+        Returns:
+            Abgerufene Seiten, sortiert nach Frontier-Score (Suchergebnisse
+            in Ranking-Reihenfolge zuerst), unabhängig von der Abruf-Reihenfolge
+        """
+        if seeds is None:
+            seeds = await self.search(query, max_results)
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + time_budget
+        terms = self._query_terms(query)
+        frontier = CrawlFrontier(max_pages_per_host=max_pages_per_host)
+        originals = {}
+        
+        # Suchergebnisse zuerst, in Ranking-Reihenfolge
+        for rank, seed in enumerate(seeds):
+            url = self._normalize_url(seed.url)
+            if frontier.push(url, 100.0 - rank, 0):
+                originals[url] = seed
+        
+        logger.info(
+            f"Starte Crawl für '{query}' ({len(originals)} Startpunkte, "
+            f"max_pages={max_pages}, max_depth={max_depth})"
+        )
+        
+        pages: List[Tuple[float, str, SearchResult]] = []
+        in_flight: Dict[asyncio.Task, Tuple[str, int, float]] = {}
+        started = 0
+        
+        try:
+            while loop.time() < deadline:
+                # Freie Slots mit den besten abrufbaren URLs füllen
+                while len(in_flight) < self.max_concurrent_requests and started < max_pages:
+                    item = frontier.pop()
+                    if item is None:
+                        break
+                    url, depth, score = item
+                    task = asyncio.ensure_future(self._scrape_url(url, max_content_length))
+                    in_flight[task] = (url, depth, score)
+                    started += 1
+                    logger.debug(f"Crawl: {url} (Tiefe {depth}, Score {score:.2f})")
+                
+                if not in_flight:
+                    break
+                
+                done, _ = await asyncio.wait(
+                    in_flight,
+                    timeout=max(0.0, deadline - loop.time()),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                
+                for task in done:
+                    url, depth, score = in_flight.pop(task)
+                    frontier.done(url)
+                    result = task.result()
+                    
+                    original = originals.get(url)
+                    if original is not None:
+                        result.title = original.title or result.title
+                        result.snippet = original.snippet
+                    pages.append((score, url, result))
+                    
+                    if not result.scrape_success or depth >= max_depth:
+                        continue
+                    
+                    relevance = self._term_coverage(terms, result.content)
+                    for link in result.links:
+                        frontier.push(
+                            link.url,
+                            self._score_link(terms, link, relevance, depth + 1),
+                            depth + 1
+                        )
+        finally:
+            # Nach Ablauf des Budgets laufende Abrufe abbrechen
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+        
+        # Stabile Quellen-Reihenfolge im Kontext, egal welcher Abruf zuerst fertig ist
+        pages.sort(key=lambda page: (-page[0], page[1]))
+        results = [result for _, _, result in pages]
+        
+        successful = sum(1 for r in results if r.scrape_success)
+        logger.info(
+            f"Crawl abgeschlossen: {successful}/{len(pages)} Seiten erfolgreich, "
+            f"{len(frontier)} URLs offen"
+        )
+        return results
+    
+    async def crawl_and_build_context(
+        self,
+        query: str,
+        max_results: int = 3,
+        max_pages: int = 10,
+        max_depth: int = 2,
+        time_budget: float = 30.0,
+        max_pages_per_host: int = 4,
+        max_content_length: Optional[int] = None,
+        passage_size: Optional[int] = None,
+        expand_context: bool = True
+    ) -> WebSearchContext:
+        """
+        Wie search_and_build_context, folgt aber Links über mehrere Hops.
+        
+        Args:
+            query: Suchbegriff
+            max_results: Anzahl der Suchergebnisse als Startpunkte
+            max_pages: Maximale Anzahl abgerufener Seiten
+            max_depth: Maximale Link-Tiefe
+            time_budget: Zeitbudget in Sekunden
+            max_pages_per_host: Maximale Anzahl Seiten pro Host
+            max_content_length: Maximale Content-Länge pro URL
+            passage_size: Optionale Maximallänge für Passagen
+            expand_context: False = nur Kontext-Segmente statt combined_context
+            
+        Returns:
+            WebSearchContext mit allen abgerufenen Seiten
+        """
+        if self.profiler is None:
+            return await self._crawl_and_build_context(
+                query, max_results, max_pages, max_depth, time_budget,
+                max_pages_per_host, max_content_length, passage_size, expand_context
+            )
+        
+        async with self.profiler.profile("crawl", query):
+            return await self._crawl_and_build_context(
+                query, max_results, max_pages, max_depth, time_budget,
+                max_pages_per_host, max_content_length, passage_size, expand_context
+            )
+    
+    async def _crawl_and_build_context(
+        self,
+        query: str,
+        max_results: int,
+        max_pages: int,
+        max_depth: int,
+        time_budget: float,
+        max_pages_per_host: int,
+        max_content_length: Optional[int],
+        passage_size: Optional[int],
+        expand_context: bool = True
+    ) -> WebSearchContext:
+        """Workflow ohne Profiling (siehe crawl_and_build_context)"""
+        pages = await self.crawl(
+            query,
+            max_results=max_results,
+            max_pages=max_pages,
+            max_depth=max_depth,
+            time_budget=time_budget,
+            max_pages_per_host=max_pages_per_host,
+            max_content_length=max_content_length
+        )
+        
+        if passage_size:
+            for page in pages:
+                if page.scrape_success:
+                    page.passages = self.chunk_passages(page, passage_size)
+        
+        pages = await self._rerank(query, pages)
+        
+        if pages:
+            context_fields = self._context_fields(query, pages, expand_context)
+        else:
+            context_fields = {"combined_context": "Keine Suchergebnisse gefunden."}
+        
+        successful = sum(1 for r in pages if r.scrape_success)
+        return WebSearchContext(
+            query=query,
+            results=pages,
+            total_sources=len(pages),
+            successful_scrapes=successful,
+            failed_scrapes=len(pages) - successful,
+            path="crawl",
+            **context_fields
+        )
+    
+    @staticmethod
+    def _use_snippet(result: SearchResult) -> SearchResult:
+        """Setzt das Such-Snippet als Content eines Ergebnisses ein"""
+        result.content = result.snippet
+        result.content_length = len(result.snippet)
+        result.from_snippet = True
+        return result
+    
+    async def adaptive_search_and_build_context(
+        self,
+        query: str,
+        max_results: int = 5,
+        max_content_length: Optional[int] = None,
+        snippet_threshold: float = 0.8,
+        passage_size: Optional[int] = None,
+        expand_context: bool = True
+    ) -> WebSearchContext:
+        """
+        Snippet-first Workflow: scraped nur, wenn die Snippets nicht reichen.
+        
+        Die Abdeckung der Suchbegriffe durch Titel und Snippets entscheidet
+        über den Pfad (WebSearchContext.path):
+        
+        - "snippets": alle Begriffe sind gut abgedeckt, und mindestens zwei
+          Snippets decken einzeln die Hälfte ab. Der Kontext besteht nur aus
+          Snippets, es wird nichts gescraped.
+        - "partial": die Snippets decken die Begriffe teilweise ab. Nur die
+          passendere Hälfte der Ergebnisse wird gescraped, die übrigen
+          bleiben als Snippets im Kontext.
+        - "scrape": zu geringe Abdeckung, alle Ergebnisse werden gescraped.
+        
+        Enthält die Anfrage keine Suchbegriffe (nur Füllwörter), fehlt das
+        Signal; dann werden wie bei "partial" die vorderen Ergebnisse gescraped.
+        
+        Fehlgeschlagene Scrapes fallen auf ihr Snippet zurück.
+        
+        Args:
+            query: Suchbegriff
+            max_results: Anzahl der Suchergebnisse
+            max_content_length: Maximale Content-Länge pro URL
+            snippet_threshold: Nötige Abdeckung (0..1) für den Snippet-Pfad
+            passage_size: Optionale Maximallänge für Passagen
+            expand_context: False = nur Kontext-Segmente statt combined_context
+            
+        Returns:
+            WebSearchContext mit path = "snippets", "partial" oder "scrape"
+        """
+        if self.profiler is None:
+            return await self._adaptive_search_and_build_context(
+                query, max_results, max_content_length, snippet_threshold, passage_size,
+                expand_context
+            )
+        
+        async with self.profiler.profile("adaptive", query):
+            return await self._adaptive_search_and_build_context(
+                query, max_results, max_content_length, snippet_threshold, passage_size,
+                expand_context
+            )
+    
+    async def _adaptive_search_and_build_context(
+        self,
+        query: str,
+        max_results: int,
+        max_content_length: Optional[int],
+        snippet_threshold: float,
+        passage_size: Optional[int],
+        expand_context: bool = True
+    ) -> WebSearchContext:
+        """Workflow ohne Profiling (siehe adaptive_search_and_build_context)"""
+        search_results = await self.search(query, max_results)
+        if not search_results:
+            logger.warning("Keine Suchergebnisse gefunden")
+            return WebSearchContext(
+                query=query,
+                results=[],
+                combined_context="Keine Suchergebnisse gefunden.",
+                total_sources=0,
+                successful_scrapes=0,
+                failed_scrapes=0,
+                path="snippets"
+            )
+        
+        terms = self._query_terms(query)
+        scores = [
+            self._term_coverage(terms, f"{r.title} {r.snippet}") for r in search_results
+        ]
+        combined = self._term_coverage(
+            terms, " ".join(f"{r.title} {r.snippet}" for r in search_results)
+        )
+        strong = sum(1 for score in scores if score >= 0.5)
+        
+        if not terms:
+            # Keine Suchbegriffe: Abdeckung sagt nichts aus, daher weder nur
+            # Snippets noch alles scrapen, sondern die vorderen Ergebnisse
+            path = "partial"
+            to_scrape = list(range(max(1, (len(search_results) + 1) // 2)))
+        elif combined >= snippet_threshold and strong >= min(2, len(search_results)):
+            path = "snippets"
+            to_scrape = []
+        elif combined >= snippet_threshold / 2:
+            path = "partial"
+            ranked = sorted(range(len(search_results)), key=lambda i: -scores[i])
+            to_scrape = sorted(ranked[:max(1, (len(search_results) + 1) // 2)])
+        else:
+            path = "scrape"
+            to_scrape = list(range(len(search_results)))
+        
+        logger.info(
+            f"Snippet-Abdeckung {combined:.2f} ({strong} starke Snippets): "
+            f"Pfad '{path}', scrape {len(to_scrape)}/{len(search_results)}"
+        )
+        
+        results = list(search_results)
+        if to_scrape:
+            scraped = await self.scrape_results(
+                [search_results[i] for i in to_scrape],
+                passage_size,
+                max_content_length
+            )
+            for i, result in zip(to_scrape, scraped):
+                results[i] = result
+        
+        for i, result in enumerate(results):
+            if not result.scrape_success and result.snippet:
+                results[i] = self._use_snippet(result)
+        
+        results = await self._rerank(query, results)
+        
+        successful = sum(1 for r in results if r.scrape_success)
+        return WebSearchContext(
+            query=query,
+            results=results,
+            total_sources=len(results),
+            successful_scrapes=successful,
+            failed_scrapes=len(to_scrape) - successful,
+            path=path,
+            **self._context_fields(query, results, expand_context)
+        )
+    
+    async def _rerank(self, query: str, results: List[SearchResult]) -> List[SearchResult]:
+        """
+        Sortiert Ergebnisse mit dem Reranker (falls konfiguriert).
+        
+        Schlägt der Rerank fehl (z.B. Ollama nicht erreichbar), bleibt die
+        ursprüngliche Reihenfolge erhalten.
+        """
+        if self.reranker is None:
+            return results
+        try:
+            return await self.reranker.rerank(query, results, self)
+        except Exception as e:
+            logger.warning(f"Rerank fehlgeschlagen, behalte Reihenfolge: {e}")
+            return results
+    
     async def close(self):
         """Schließt alle Verbindungen gracefully"""
+        if self.reranker is not None:
+            await self.reranker.close()
+        if self.transport is not None:
+            self.transport.close()
         if self.session and not self.session.closed:
             await self.session.close()
             logger.info("Session geschlossen")
@@ -564,9 +1563,13 @@ class OllamaIntegration:
     den Output direkt für Ollama-API-Requests.
     """
     
-    def __init__(self, ollama_base_url: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        ollama_base_url: str = "http://localhost:11434",
+        integrator: Optional[WebSearchIntegrator] = None
+    ):
         self.ollama_base_url = ollama_base_url
-        self.integrator = WebSearchIntegrator()
+        self.integrator = integrator or WebSearchIntegrator()
     
     async def query_with_web_context(
         self,
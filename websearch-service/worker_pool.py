@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+WorkerPool - Supervisor für mehrere api_bridge.py-Worker
+========================================================
+
+Ein WebSearchIntegrator läuft auf einem Event-Loop in einem Prozess; das
+HTML-Parsing aller parallelen Anfragen teilt sich damit einen Kern. Der
+WorkerPool startet N Worker-Prozesse (api_bridge.py --serve), jeder mit
+eigenem Event-Loop und eigener Session, und verteilt die JSON-Zeilen-Anfragen
+von stdin auf sie.
+
+Verteilung:
+- Affinität: die normalisierte Query bestimmt den bevorzugten Worker.
+  Gleiche Anfragen landen so beim selben Worker (Request-Coalescing greift)
+  und treffen dort dieselben Hosts, deren Verbindungen warm bleiben.
+- Lastausgleich: hat der bevorzugte Worker deutlich mehr offene Anfragen als
+  der am wenigsten belastete, geht die Anfrage an letzteren.
+
+Seiten werden über einen gemeinsamen Page-Cache (siehe page_cache.py)
+zwischen den Workern geteilt. Beendet sich ein Worker, erhalten seine offenen
+Anfragen eine Fehlerantwort und der Worker wird mit exponentiellem Backoff neu
+gestartet. Stirbt ein Worker zu oft kurz nach dem Start (z.B. fehlende
+Abhängigkeit oder Archivdatei), bricht der Supervisor mit einem Fehler ab.
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from websearch_integrator import WebSearchIntegrator, logger
+
+_decoder = json.JSONDecoder()
+
+
+class WorkerPoolError(Exception):
+    """Worker lassen sich nicht dauerhaft starten"""
+
+
+def _response_id(line: bytes) -> Any:
+    """Liest die id einer Worker-Antwort, ohne den ganzen Payload zu parsen"""
+    text = line.decode("utf-8")
+    if text.startswith('{"id":'):
+        try:
+            return _decoder.raw_decode(text, 6)[0]
+        except ValueError:
+            pass
+    return json.loads(text).get("id")
+
+
+class Worker:
+    """Ein Worker-Prozess mit seinen offenen Anfrage-IDs"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.pending: Set[Any] = set()
+        self.reader: Optional[asyncio.Task] = None
+        self.started_at = 0.0
+        self.quick_exits = 0
+
+
+class WorkerPool:
+    """Verteilt JSON-Zeilen-Anfragen auf mehrere Worker-Prozesse"""
+
+    def __init__(
+        self,
+        command: List[str],
+        workers: int = 2,
+        imbalance: int = 2,
+        max_quick_restarts: int = 5,
+        quick_exit_seconds: float = 30.0,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0
+    ):
+        """
+        Args:
+            command: Kommando eines Workers (api_bridge.py --serve ...)
+            workers: Anzahl Worker-Prozesse
+            imbalance: Erlaubter Mehr-Rückstand des bevorzugten Workers
+                gegenüber dem am wenigsten belasteten
+            max_quick_restarts: Maximale Neustarts in Folge nach jeweils
+                kurzer Laufzeit, danach bricht der Supervisor ab
+            quick_exit_seconds: Laufzeit, unter der ein Exit als "kurz" gilt
+            backoff_base: Wartezeit vor dem ersten Neustart in Sekunden
+                (verdoppelt sich mit jedem weiteren kurzen Exit)
+            backoff_max: Maximale Wartezeit vor einem Neustart
+        """
+        self.command = command
+        self.workers = [Worker(i) for i in range(workers)]
+        self.imbalance = imbalance
+        self.max_quick_restarts = max_quick_restarts
+        self.quick_exit_seconds = quick_exit_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._stopping = False
+        self._fatal: Optional[asyncio.Future] = None
+        self._write_lock = asyncio.Lock()
+
+    async def _start(self, worker: Worker):
+        worker.process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=2 ** 26
+        )
+        worker.started_at = time.monotonic()
+        worker.reader = asyncio.create_task(self._read(worker))
+        logger.info(f"Worker {worker.index} gestartet (pid {worker.process.pid})")
+
+    async def _respond(self, line: bytes):
+        async with self._write_lock:
+            sys.stdout.buffer.write(line if line.endswith(b"\n") else line + b"\n")
+            sys.stdout.buffer.flush()
+
+    async def _read(self, worker: Worker):
+        """Leitet Antworten eines Workers nach stdout weiter"""
+        process = worker.process
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            try:
+                worker.pending.discard(_response_id(line))
+            except ValueError:
+                logger.error(f"Worker {worker.index}: ungültige Antwort")
+                continue
+            await self._respond(line)
+
+        await process.wait()
+        if self._stopping:
+            return
+
+        # Worker unerwartet beendet: offene Anfragen beantworten, neu starten
+        for request_id in worker.pending:
+            error = {"id": request_id, "error": "Worker beendet"}
+            await self._respond(json.dumps(error, ensure_ascii=False).encode("utf-8"))
+        worker.pending.clear()
+        
+        if time.monotonic() - worker.started_at < self.quick_exit_seconds:
+            worker.quick_exits += 1
+        else:
+            worker.quick_exits = 0
+        
+        if worker.quick_exits > self.max_quick_restarts:
+            message = (
+                f"Worker {worker.index} {worker.quick_exits}x kurz nach dem Start beendet "
+                f"(Exit-Code {process.returncode}), Supervisor bricht ab"
+            )
+            logger.error(message)
+            if not self._fatal.done():
+                self._fatal.set_exception(WorkerPoolError(message))
+            return
+        
+        delay = 0.0
+        if worker.quick_exits:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (worker.quick_exits - 1))
+        logger.error(
+            f"Worker {worker.index} beendet (Exit-Code {process.returncode}), "
+            f"Neustart in {delay:.1f}s"
+        )
+        await asyncio.sleep(delay)
+        if not self._stopping:
+            await self._start(worker)
+
+    @staticmethod
+    def preferred_index(query: str, workers: int) -> int:
+        """Index des bevorzugten Workers für eine Query (Affinität)"""
+        key = WebSearchIntegrator._normalize_query(query)
+        digest = hashlib.sha1(key.encode("utf-8")).digest()
+        return int.from_bytes(digest[:4], "big") % workers
+
+    def _choose(self, request: Dict[str, Any]) -> Worker:
+        """Wählt den Worker per Query-Affinität mit Lastausgleich"""
+        preferred = self.workers[
+            self.preferred_index(str(request.get("query", "")), len(self.workers))
+        ]
+
+        # Worker, die gerade neu gestartet werden, überspringen
+        running = [w for w in self.workers if w.process.returncode is None] or self.workers
+        least = min(running, key=lambda w: len(w.pending))
+        if preferred not in running or len(preferred.pending) - len(least.pending) > self.imbalance:
+            return least
+        return preferred
+
+    async def dispatch(self, line: bytes):
+        """Leitet eine Anfrage-Zeile an einen Worker weiter"""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Anfrage muss ein JSON-Objekt sein")
+        except ValueError as e:
+            await self._respond(json.dumps({"id": None, "error": str(e)}).encode("utf-8"))
+            return
+
+        request_id = request.get("id")
+        if isinstance(request_id, (list, dict)):
+            # Offene Anfragen werden über die id zugeordnet (muss hashbar sein)
+            error = {"id": request_id, "error": "id muss eine Zahl oder ein String sein"}
+            await self._respond(json.dumps(error, ensure_ascii=False).encode("utf-8"))
+            return
+
+        worker = self._choose(request)
+        worker.pending.add(request_id)
+        try:
+            worker.process.stdin.write(line if line.endswith(b"\n") else line + b"\n")
+            await worker.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            worker.pending.discard(request_id)
+            error = {"id": request_id, "error": "Worker nicht erreichbar"}
+            await self._respond(json.dumps(error, ensure_ascii=False).encode("utf-8"))
+
+    async def run(self):
+        """
+        Liest Anfragen von stdin, bis stdin geschlossen wird.
+        
+        Endet ein Worker zu oft kurz nach dem Start, werden alle Worker
+        beendet und WorkerPoolError geworfen.
+        """
+        self._fatal = asyncio.get_running_loop().create_future()
+        for worker in self.workers:
+            await self._start(worker)
+
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=2 ** 20)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+        logger.info(f"Supervisor gestartet ({len(self.workers)} Worker)")
+
+        while True:
+            read = asyncio.ensure_future(reader.readline())
+            await asyncio.wait({read, self._fatal}, return_when=asyncio.FIRST_COMPLETED)
+            if self._fatal.done():
+                read.cancel()
+                await self._shutdown()
+                self._fatal.result()
+            line = read.result()
+            if not line:
+                break
+            if line.strip():
+                await self.dispatch(line)
+
+        # stdin geschlossen: Worker laufende Anfragen abschließen lassen
+        self._stopping = True
+        for worker in self.workers:
+            worker.process.stdin.close()
+        await asyncio.gather(*(w.reader for w in self.workers))
+
+        logger.info("Supervisor beendet")
+    
+    async def _shutdown(self):
+        """Beendet alle Worker nach einem fatalen Fehler"""
+        self._stopping = True
+        for worker in self.workers:
+            if worker.process is not None and worker.process.returncode is None:
+                worker.process.kill()
+            if worker.reader is not None:
+                worker.reader.cancel()
+        await asyncio.gather(
+            *(w.reader for w in self.workers if w.reader is not None),
+            return_exceptions=True
+        )
+        for worker in self.workers:
+            if worker.process is not None:
+                await worker.process.wait()